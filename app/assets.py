@@ -0,0 +1,254 @@
+"""Fingerprinted, precompressed static assets.
+
+``build_assets`` minifies the front-end assets, writes them under a
+content-hashed name (``app.3f2a9c1b7d4e.js``) into ``STATIC_BUILD_DIR`` together
+with ``.gz`` and, when the ``brotli`` package is installed, ``.br`` variants,
+and records the mapping in ``manifest.json``. Hashed files never change, so
+they are served with ``Cache-Control: immutable`` and repeat visits do not
+touch the network for them. Templates resolve URLs through ``asset_url``,
+which falls back to the plain ``/static`` path when no build is available.
+
+Run ``python -m app.assets`` to build ahead of time; otherwise the build runs
+on startup whenever the sources changed.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+try:  # pragma: no cover - optional encoding
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+try:  # pragma: no cover - optional minifier
+    import rjsmin
+except ImportError:  # pragma: no cover - optional minifier
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+ASSETS: Tuple[str, ...] = ("app.js", "styles.css")
+ASSETS_URL_PREFIX = "/assets"
+STATIC_URL_PREFIX = "/static"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+TMP_SUFFIX = ".tmp"
+ASSET_FILE_MODE = 0o644
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Preferred first when the client accepts several encodings.
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_CSS_STRING_OR_COMMENT = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.DOTALL)
+_CSS_WHITESPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+_manifest: Dict[str, str] = {}
+
+
+def get_build_dir() -> Path:
+    raw_path = os.getenv("STATIC_BUILD_DIR", "").strip()
+    return Path(raw_path) if raw_path else Path(__file__).resolve().parent / "static_build"
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and redundant whitespace, leaving string literals untouched."""
+
+    parts = []
+    code = ""
+    position = 0
+    for match in _CSS_STRING_OR_COMMENT.finditer(source):
+        code += source[position : match.start()]
+        position = match.end()
+        if match.group(1):
+            parts.append(_minify_css_code(code))
+            parts.append(match.group(1))
+            code = ""
+        else:
+            code += " "
+    parts.append(_minify_css_code(code + source[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_css_code(code: str) -> str:
+    code = _CSS_WHITESPACE.sub(" ", code)
+    code = _CSS_PUNCTUATION.sub(r"\1", code)
+    # Only the space after a colon is safe to drop: before one it may be a
+    # descendant combinator (``a :hover``).
+    return code.replace(": ", ":").replace(";}", "}")
+
+
+def minify_js(source: str) -> str:
+    """Minify with ``rjsmin`` when installed; otherwise ship the source as-is."""
+
+    if rjsmin is None:
+        return source
+    return rjsmin.jsmin(source)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def _write(path: Path, data: bytes) -> None:
+    # Unique temp names keep concurrent builds (one per worker) from clobbering
+    # each other's partially written files.
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f"{path.name}.", suffix=TMP_SUFFIX, delete=False
+    ) as handle:
+        handle.write(data)
+    try:
+        # NamedTemporaryFile creates 0600 files; assets must stay readable by
+        # whoever serves them (another user, a proxy or a CDN origin).
+        os.chmod(handle.name, ASSET_FILE_MODE)
+        os.replace(handle.name, path)
+    except OSError:
+        Path(handle.name).unlink(missing_ok=True)
+        raise
+
+
+def _sources_digest(source_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for name in ASSETS:
+        digest.update(name.encode("utf-8"))
+        digest.update((source_dir / name).read_bytes())
+    digest.update(f"rjsmin={rjsmin is not None},brotli={brotli is not None}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_assets(source_dir: Path = STATIC_DIR, build_dir: Optional[Path] = None) -> Dict[str, str]:
+    """Build every asset into ``build_dir`` and return the ``name -> hashed name`` manifest."""
+
+    build_dir = build_dir or get_build_dir()
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    files: Dict[str, str] = {}
+    for name in ASSETS:
+        source_path = source_dir / name
+        minify = MINIFIERS.get(source_path.suffix)
+        text = source_path.read_text(encoding="utf-8")
+        data = (minify(text) if minify else text).encode("utf-8")
+
+        fingerprint = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        hashed_name = f"{source_path.stem}.{fingerprint}{source_path.suffix}"
+        _write(build_dir / hashed_name, data)
+        _write(build_dir / f"{hashed_name}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(build_dir / f"{hashed_name}.br", brotli.compress(data, mode=brotli.MODE_TEXT))
+        files[name] = hashed_name
+        logger.info(
+            "Built %s -> %s (%d -> %d bytes)", name, hashed_name, source_path.stat().st_size, len(data)
+        )
+
+    manifest = {"sources": _sources_digest(source_dir), "files": files}
+    _write(build_dir / MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+    _remove_stale_files(build_dir, files)
+    return files
+
+
+def _remove_stale_files(build_dir: Path, files: Dict[str, str]) -> None:
+    current = set(files.values())
+    for path in build_dir.iterdir():
+        name = path.name
+        if name.endswith(TMP_SUFFIX):
+            continue
+        for suffix in ENCODING_SUFFIXES.values():
+            if name.endswith(suffix):
+                name = name[: -len(suffix)]
+        if name != MANIFEST_NAME and name not in current:
+            path.unlink(missing_ok=True)
+
+
+def _read_manifest(build_dir: Path) -> Optional[Dict[str, object]]:
+    try:
+        manifest = json.loads((build_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        return None
+    return manifest
+
+
+def prepare_assets(source_dir: Path = STATIC_DIR, build_dir: Optional[Path] = None) -> None:
+    """Load the manifest, rebuilding it first when the sources have changed.
+
+    Failures are logged and leave templates pointing at the plain ``/static``
+    files, so a read-only or broken build directory never stops the app.
+    """
+
+    build_dir = build_dir or get_build_dir()
+    _manifest.clear()
+    try:
+        manifest = _read_manifest(build_dir)
+        if manifest is None or manifest.get("sources") != _sources_digest(source_dir):
+            files = build_assets(source_dir, build_dir)
+        else:
+            files = manifest["files"]
+            logger.debug("Static assets are up to date in %s", build_dir)
+    except OSError:
+        logger.exception("Failed to build static assets into %s, serving unversioned files", build_dir)
+        return
+    _manifest.update(files)
+
+
+def asset_url(name: str) -> str:
+    """Return the fingerprinted URL for ``name`` or its plain ``/static`` URL."""
+
+    hashed_name = _manifest.get(name)
+    if hashed_name is None:
+        return f"{STATIC_URL_PREFIX}/{name}"
+    return f"{ASSETS_URL_PREFIX}/{hashed_name}"
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def resolve_asset(
+    filename: str, accept_encoding: str, build_dir: Optional[Path] = None
+) -> Optional[Tuple[Path, Optional[str]]]:
+    """Return the file to send for ``filename`` and its content encoding.
+
+    Only names from the current manifest are served; the smallest variant the
+    client accepts wins, falling back to the uncompressed file.
+    """
+
+    if filename not in _manifest.values():
+        return None
+    build_dir = build_dir or get_build_dir()
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        variant = build_dir / f"{filename}{suffix}"
+        if (encoding in accepted or "*" in accepted) and variant.is_file():
+            return variant, encoding
+    path = build_dir / filename
+    return (path, None) if path.is_file() else None
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    build_dir = get_build_dir()
+    files = build_assets(build_dir=build_dir)
+    logger.info("Wrote %d assets to %s", len(files), build_dir)
+
+
+if __name__ == "__main__":
+    main()
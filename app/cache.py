@@ -9,19 +9,34 @@ class TTLCache:
         self.ttl = ttl
         self._store: dict[str, Tuple[float, Any]] = {}
         self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
         self._logger = logging.getLogger(self.__class__.__name__)
 
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str, record_stats: bool = True) -> Optional[Any]:
+        """Return the live value for ``key``.
+
+        Pass ``record_stats=False`` for follow-up lookups made while serving a
+        request that already counted a hit or miss, so the counters stay per
+        request.
+        """
+
         with self._lock:
             item = self._store.get(key)
             if not item:
+                if record_stats:
+                    self.misses += 1
                 self._logger.debug("Cache miss for key '%s'", key)
                 return None
             expires_at, value = item
             if expires_at < time.time():
                 self._store.pop(key, None)
+                if record_stats:
+                    self.misses += 1
                 self._logger.debug("Cache expired for key '%s'", key)
                 return None
+            if record_stats:
+                self.hits += 1
             self._logger.debug("Cache hit for key '%s'", key)
             return value
 
@@ -35,6 +50,11 @@ class TTLCache:
             self._store.pop(key, None)
             self._logger.debug("Cache delete for key '%s'", key)
 
+    def __len__(self) -> int:
+        with self._lock:
+            now = time.time()
+            return sum(1 for expires_at, _ in self._store.values() if expires_at >= now)
+
     def clear(self) -> None:
         with self._lock:
             self._store.clear()
@@ -55,7 +55,15 @@ def session_scope() -> Generator:
 
 def init_db() -> None:
     from app import models  # noqa: F401 - ensure models are imported
+    from app.search import ensure_search_index
+    from app.stats import backfill_if_empty
 
     logger.info("Ensuring all database tables are created")
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    session = SessionLocal()
+    try:
+        backfill_if_empty(session)
+    finally:
+        session.close()
 
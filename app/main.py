@@ -2,7 +2,6 @@ import logging
 import os
 import sys
 from pathlib import Path
-from typing import List
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
@@ -10,7 +9,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -24,11 +22,13 @@ if __package__ in {None, ""}:
 # initialising on start.
 load_dotenv(PROJECT_ROOT / ".env")
 
-from app import schemas
+from app.assets import asset_url, prepare_assets
 from app.cache import houses_cache
-from app.database import SessionLocal, init_db
-from app.models import House
-from app.routers import buildings, comments, houses
+from app.database import engine, init_db
+from app.metrics import install_sqlalchemy_hooks, metrics_middleware, register_cache_metrics
+from app.profiling import profiling_middleware
+from app.routers import admin, assets, buildings, comments, health, houses, metrics, stats
+from app.warmup import application_started, get_snapshot_path, start_warmup, write_snapshot
 
 
 def configure_logging() -> None:
@@ -54,40 +54,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(metrics_middleware)
+install_sqlalchemy_hooks(engine)
+register_cache_metrics("houses_cache", houses_cache)
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+templates.env.globals["asset_url"] = asset_url
 
 app.include_router(houses.router)
 app.include_router(comments.router)
 app.include_router(buildings.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+app.include_router(assets.router)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     logger.info("Starting FlatDrawer application")
     init_db()
-    db = SessionLocal()
+    prepare_assets()
+    start_warmup()
+    application_started.set()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    snapshot_path = get_snapshot_path()
+    if snapshot_path is None:
+        return
     try:
-        logger.debug("Preloading houses cache during startup")
-        preload_houses_cache(db)
-    finally:
-        db.close()
-        logger.debug("Database session closed after startup preload")
-
-
-def preload_houses_cache(db: Session) -> None:
-    logger.debug("Loading houses from the database to warm the cache")
-    houses: List[House] = (
-        db.query(House)
-        .options(joinedload(House.comments))
-        .order_by(House.created_at.desc())
-        .all()
-    )
-    serialized = [schemas.HouseRead.from_orm(house) for house in houses]
-    houses_cache.set("all", serialized)
-    logger.info("Preloaded %d houses into cache", len(serialized))
+        write_snapshot(snapshot_path)
+    except Exception:  # noqa: BLE001 - never fail shutdown because of the snapshot
+        logger.exception("Failed to write cache snapshot to %s", snapshot_path)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -0,0 +1,313 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only the handful of primitives the application needs are implemented here so
+that instrumentation does not require an extra dependency.
+"""
+
+import contextvars
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+QUERY_COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]) -> None:
+        super().__init__(name, documentation)
+        self._callback = callback
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        try:
+            value = float(self._callback())
+        except Exception:  # noqa: BLE001 - a broken gauge must not break the scrape
+            logger.exception("Failed to collect gauge %s", self.name)
+            return lines
+        lines.append(f"{self.name} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._series[labels] = series
+            counts, totals = series
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(
+                (labels, (list(counts), list(totals))) for labels, (counts, totals) in self._series.items()
+            )
+        for labels, (counts, totals) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{label_str} {_format_value(totals[1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "flatdrawer_http_request_duration_seconds",
+        "HTTP request latency by route template.",
+        ("method", "route", "status"),
+    )
+)
+db_queries_per_request = registry.register(
+    Histogram(
+        "flatdrawer_db_queries_per_request",
+        "Number of SQL statements executed while handling a request.",
+        ("method", "route"),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+db_time_per_request = registry.register(
+    Histogram(
+        "flatdrawer_db_time_per_request_seconds",
+        "Time spent executing SQL statements while handling a request.",
+        ("method", "route"),
+    )
+)
+db_queries_total = registry.register(
+    Counter("flatdrawer_db_queries_total", "SQL statements executed by the application.")
+)
+db_query_errors_total = registry.register(
+    Counter("flatdrawer_db_query_errors_total", "SQL statements that raised an error.")
+)
+upstream_request_duration = registry.register(
+    Histogram(
+        "flatdrawer_upstream_request_duration_seconds",
+        "Latency of calls to external providers.",
+        ("provider",),
+    )
+)
+upstream_errors_total = registry.register(
+    Counter(
+        "flatdrawer_upstream_errors_total",
+        "Failed calls to external providers.",
+        ("provider", "error"),
+    )
+)
+
+
+def register_cache_metrics(name: str, cache) -> None:
+    """Expose hit, miss and size gauges for a ``TTLCache`` instance."""
+
+    registry.register(
+        Gauge(f"flatdrawer_{name}_hits", f"Cache hits for {name} since start.", lambda: cache.hits)
+    )
+    registry.register(
+        Gauge(f"flatdrawer_{name}_misses", f"Cache misses for {name} since start.", lambda: cache.misses)
+    )
+    registry.register(
+        Gauge(f"flatdrawer_{name}_size", f"Number of live entries in {name}.", lambda: len(cache))
+    )
+
+
+class _RequestDbStats:
+    __slots__ = ("queries", "duration")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.duration = 0.0
+
+
+_request_db_stats: contextvars.ContextVar[Optional[_RequestDbStats]] = contextvars.ContextVar(
+    "flatdrawer_request_db_stats", default=None
+)
+
+
+QUERY_START_KEY = "flatdrawer_query_start"
+
+
+def install_sqlalchemy_hooks(engine: Engine) -> None:
+    """Count and time every statement executed through ``engine``."""
+
+    def record_query(conn) -> None:  # noqa: ANN001
+        starts = conn.info.get(QUERY_START_KEY)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        db_queries_total.inc()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.duration += elapsed
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault(QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        record_query(conn)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context) -> None:  # noqa: ANN001
+        # Failed statements never reach after_cursor_execute; without this the
+        # start stack of a pooled connection would grow with every failure.
+        conn = exception_context.connection
+        if conn is None or exception_context.cursor is None:
+            return
+        db_query_errors_total.inc()
+        record_query(conn)
+
+
+@contextmanager
+def track_upstream(provider: str) -> Iterator[None]:
+    """Record latency and failures of a call to an external provider."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        upstream_errors_total.inc(provider, type(exc).__name__)
+        raise
+    finally:
+        upstream_request_duration.observe(time.perf_counter() - started, provider)
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next) -> Response:  # noqa: ANN001
+    stats = _RequestDbStats()
+    token = _request_db_stats.set(stats)
+    started = time.perf_counter()
+    status_code = "500"
+    try:
+        response = await call_next(request)
+        status_code = str(response.status_code)
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        _request_db_stats.reset(token)
+        route = _route_template(request)
+        http_request_duration.observe(elapsed, request.method, route, status_code)
+        db_queries_per_request.observe(stats.queries, request.method, route)
+        db_time_per_request.observe(stats.duration, request.method, route)
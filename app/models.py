@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Enum as SqlEnum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, DateTime, Enum as SqlEnum, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -25,6 +25,12 @@ class House(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     comments = relationship("Comment", back_populates="house", cascade="all, delete-orphan")
+    footprints = relationship(
+        "HouseFootprint",
+        back_populates="house",
+        cascade="all, delete-orphan",
+        order_by="HouseFootprint.min_zoom",
+    )
 
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         return f"<House id={self.id} address={self.address!r} status={self.status}>"
@@ -42,4 +48,54 @@ class Comment(Base):
     house = relationship("House", back_populates="comments")
 
     def __repr__(self) -> str:  # pragma: no cover - debug helper
-        return f"<Comment id={self.id} house_id={self.house_id} author={self.author!r}>"
\ No newline at end of file
+        return f"<Comment id={self.id} house_id={self.house_id} author={self.author!r}>"
+
+
+class HouseFootprint(Base):
+    """Building outline of a house at one level of detail (see ``services.footprints``)."""
+
+    __tablename__ = "house_footprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    house_id = Column(Integer, ForeignKey("houses.id", ondelete="CASCADE"), nullable=False, index=True)
+    min_zoom = Column(Integer, nullable=False)
+    geometry_type = Column(String(16), nullable=False)
+    encoded = Column(Text, nullable=False)
+    points = Column(Integer, nullable=False)
+
+    house = relationship("House", back_populates="footprints")
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"<HouseFootprint house_id={self.house_id} min_zoom={self.min_zoom} points={self.points}>"
+
+
+class HouseStatusTotal(Base):
+    """Number of houses per status, maintained incrementally (see ``app.stats``)."""
+
+    __tablename__ = "house_status_totals"
+
+    status = Column(SqlEnum(HouseStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class HouseActivityBucket(Base):
+    """Per-day creation and update counters by status."""
+
+    __tablename__ = "house_activity_buckets"
+
+    day = Column(Date, primary_key=True)
+    status = Column(SqlEnum(HouseStatus), primary_key=True)
+    created = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+
+
+class HouseHeatmapCell(Base):
+    """House counts per web-mercator tile at a fixed set of levels."""
+
+    __tablename__ = "house_heatmap_cells"
+
+    level = Column(Integer, primary_key=True)
+    x = Column(Integer, primary_key=True)
+    y = Column(Integer, primary_key=True)
+    status = Column(SqlEnum(HouseStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
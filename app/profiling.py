@@ -0,0 +1,279 @@
+"""Opt-in sampling profiler for individual requests.
+
+Profiling is compiled in but inert unless ``PROFILING_ENABLED`` is set. Even
+then only requests that ask for it (``X-Profile`` header or ``profile`` query
+parameter, matching ``PROFILING_TOKEN``) on the allowed path prefixes are
+profiled, and at most one profile is captured at a time. Without a token
+profiling stays disabled.
+
+A sampling profiler is used instead of ``cProfile`` because synchronous
+endpoints run in the threadpool while the middleware runs on the event loop
+thread; ``cProfile`` would only see the latter. Only the event loop thread
+and the worker threads running the profiled request are sampled: routers
+built with ``route_class=ProfiledRoute`` register the worker that runs each
+sync endpoint. Samples are written as collapsed stacks (``*.folded``), which
+speedscope and ``flamegraph.pl`` read directly.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hmac
+import logging
+import os
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_FILE_SUFFIX = ".folded"
+PROFILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+\.folded$")
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class ProfilingSettings:
+    enabled: bool
+    token: str
+    directory: Path
+    max_files: int
+    interval: float
+    path_prefixes: Tuple[str, ...]
+
+    @classmethod
+    def from_env(cls) -> "ProfilingSettings":
+        directory = os.getenv("PROFILING_DIR") or os.path.join(tempfile.gettempdir(), "flatdrawer-profiles")
+        prefixes = os.getenv("PROFILING_PATHS", "/api/houses,/api/buildings/resolve")
+        enabled = _env_flag("PROFILING_ENABLED")
+        token = os.getenv("PROFILING_TOKEN", "").strip()
+        if enabled and not token:
+            logger.warning("PROFILING_ENABLED is set without PROFILING_TOKEN, profiling stays disabled")
+            enabled = False
+        return cls(
+            enabled=enabled,
+            token=token,
+            directory=Path(directory),
+            max_files=max(1, int(os.getenv("PROFILING_MAX_FILES", "20"))),
+            interval=max(0.001, float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000),
+            path_prefixes=tuple(prefix.strip() for prefix in prefixes.split(",") if prefix.strip()),
+        )
+
+    def token_matches(self, value: Optional[str]) -> bool:
+        if not value or not self.token:
+            return False
+        return hmac.compare_digest(value, self.token)
+
+
+settings = ProfilingSettings.from_env()
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of the threads registered with it."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._threads: Set[int] = set()
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def add_thread(self, ident: int) -> None:
+        with self._threads_lock:
+            self._threads.add(ident)
+
+    def remove_thread(self, ident: int) -> None:
+        with self._threads_lock:
+            self._threads.discard(ident)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler; blocks, so keep it off the event loop."""
+
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        thread_names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                idents = set(self._threads)
+            for thread in threading.enumerate():
+                thread_names.setdefault(thread.ident, thread.name)
+            for ident, frame in sys._current_frames().items():
+                if ident not in idents:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def render(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profile_lock = threading.Lock()
+_active_profiler: contextvars.ContextVar[Optional[SamplingProfiler]] = contextvars.ContextVar(
+    "active_profiler", default=None
+)
+
+
+def _register_worker_thread(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(endpoint) or getattr(endpoint, "_profiled", False):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # Runs in the threadpool worker that executes the endpoint; the context
+        # (and with it the active profiler) is copied over from the request.
+        profiler = _active_profiler.get()
+        if profiler is None:
+            return endpoint(*args, **kwargs)
+        ident = threading.get_ident()
+        profiler.add_thread(ident)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.remove_thread(ident)
+
+    wrapper._profiled = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint registers its worker thread with the active profiler."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _register_worker_thread(endpoint), **kwargs)
+
+
+def _should_profile(request: Request) -> bool:
+    if not settings.enabled:
+        return False
+    if not request.url.path.startswith(settings.path_prefixes):
+        return False
+    trigger = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return settings.token_matches(trigger)
+
+
+def _profile_name(request: Request, duration: float) -> str:
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_") or "root"
+    return (
+        f"{timestamp}-{request.method}-{slug[:60]}-{int(duration * 1000)}ms-"
+        f"{secrets.token_hex(3)}{PROFILE_FILE_SUFFIX}"
+    )
+
+
+def _enforce_ring_limit() -> None:
+    profiles = sorted(
+        settings.directory.glob(f"*{PROFILE_FILE_SUFFIX}"),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for stale in profiles[: max(0, len(profiles) - settings.max_files)]:
+        try:
+            stale.unlink()
+        except OSError:
+            logger.warning("Failed to remove old profile %s", stale, exc_info=True)
+
+
+def _save_profile(name: str, content: str) -> None:
+    settings.directory.mkdir(parents=True, exist_ok=True)
+    (settings.directory / name).write_text(content, encoding="utf-8")
+    _enforce_ring_limit()
+
+
+def list_profiles() -> List[Dict[str, object]]:
+    if not settings.directory.is_dir():
+        return []
+    profiles = []
+    for path in settings.directory.glob(f"*{PROFILE_FILE_SUFFIX}"):
+        stat = path.stat()
+        profiles.append(
+            {
+                "name": path.name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            }
+        )
+    profiles.sort(key=lambda item: item["created_at"], reverse=True)
+    return profiles
+
+
+def get_profile_path(name: str) -> Optional[Path]:
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = settings.directory / name
+    return path if path.is_file() else None
+
+
+async def profiling_middleware(request: Request, call_next) -> Response:  # noqa: ANN001
+    if not _should_profile(request):
+        return await call_next(request)
+
+    if not _profile_lock.acquire(blocking=False):
+        logger.info("Skipping profile for %s: another profile is in progress", request.url.path)
+        return await call_next(request)
+
+    profiler = SamplingProfiler(settings.interval)
+    profiler.add_thread(threading.get_ident())
+    token = _active_profiler.set(profiler)
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        _active_profiler.reset(token)
+        duration = time.perf_counter() - started
+        try:
+            await run_in_threadpool(profiler.stop)
+        finally:
+            _profile_lock.release()
+
+    if not profiler.sample_count:
+        logger.info("Request %s finished before the first profile sample", request.url.path)
+        return response
+
+    name = _profile_name(request, duration)
+    try:
+        await run_in_threadpool(_save_profile, name, profiler.render())
+    except OSError:
+        logger.exception("Failed to save request profile %s", name)
+        return response
+
+    logger.info(
+        "Captured profile %s (%d samples) for %s %s",
+        name,
+        profiler.sample_count,
+        request.method,
+        request.url.path,
+    )
+    response.headers[PROFILE_ID_HEADER] = name
+    return response
@@ -0,0 +1,77 @@
+"""Fast response encoding for large list endpoints.
+
+List payloads are plain dicts/lists built straight from row tuples, encoded
+with ``orjson`` when it is installed and offered as MessagePack to clients
+that ask for ``application/msgpack`` in ``Accept``. Both libraries are
+optional; without them responses fall back to the standard ``json`` module.
+"""
+
+import json
+import logging
+from typing import Any, Dict
+
+from fastapi import Request
+from starlette.responses import Response
+
+try:  # pragma: no cover - optional speedup
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:  # pragma: no cover - optional encoding
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+
+
+def _accept_qualities(header: str) -> Dict[str, float]:
+    qualities: Dict[str, float] = {}
+    for item in header.split(","):
+        media_type, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type:
+            qualities[media_type.strip().lower()] = quality
+    return qualities
+
+
+def negotiate(request: Request) -> str:
+    """Pick MessagePack only when the client explicitly prefers it over JSON."""
+
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    qualities = _accept_qualities(request.headers.get("accept", ""))
+    msgpack_quality = max((qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_quality = max(qualities.get(JSON_MEDIA_TYPE, 0.0), qualities.get("*/*", 0.0))
+    if msgpack_quality > 0 and msgpack_quality >= json_quality:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode(payload: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(payload, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_response(body: bytes, media_type: str, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def negotiated_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    media_type = negotiate(request)
+    return build_response(encode(payload, media_type), media_type, status_code)
@@ -1,3 +1,3 @@
-from . import buildings, comments, houses
+from . import admin, assets, buildings, comments, health, houses, metrics, stats
 
-__all__ = ["buildings", "comments", "houses"]
\ No newline at end of file
+__all__ = ["admin", "assets", "buildings", "comments", "health", "houses", "metrics", "stats"]
@@ -0,0 +1,42 @@
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app import profiling, schemas
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def require_profiling_access(
+    x_profile_token: Optional[str] = Header(default=None),
+) -> None:
+    if not profiling.settings.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if not profiling.settings.token_matches(x_profile_token):
+        logger.warning("Rejected profile access with an invalid token")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+
+
+@router.get(
+    "/profiles",
+    response_model=List[schemas.ProfileInfo],
+    dependencies=[Depends(require_profiling_access)],
+)
+def read_profiles() -> List[schemas.ProfileInfo]:
+    """List the most recent captured request profiles, newest first."""
+
+    return [schemas.ProfileInfo(**item) for item in profiling.list_profiles()]
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profiling_access)])
+def download_profile(name: str) -> FileResponse:
+    """Download a captured profile in collapsed-stack format."""
+
+    path = profiling.get_profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=name)
@@ -0,0 +1,28 @@
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app import assets
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix=assets.ASSETS_URL_PREFIX, tags=["assets"])
+
+MEDIA_TYPES = {".css": "text/css; charset=utf-8", ".js": "text/javascript; charset=utf-8"}
+
+
+@router.get("/{filename}", include_in_schema=False)
+def read_asset(filename: str, accept_encoding: str = Header(default="")) -> FileResponse:
+    """Serve a fingerprinted asset, precompressed when the client supports it."""
+
+    resolved = assets.resolve_asset(filename, accept_encoding)
+    if resolved is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+
+    path, encoding = resolved
+    headers = {"Cache-Control": assets.IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    suffix = "." + filename.rsplit(".", 1)[-1]
+    return FileResponse(path, media_type=MEDIA_TYPES.get(suffix), headers=headers)
@@ -3,11 +3,12 @@ import logging
 from fastapi import APIRouter, HTTPException, Query
 
 from app import schemas
+from app.profiling import ProfiledRoute
 from app.services import building_detector
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/buildings", tags=["buildings"])
+router = APIRouter(prefix="/api/buildings", tags=["buildings"], route_class=ProfiledRoute)
 
 
 @router.get("/resolve", response_model=schemas.BuildingRecognitionResponse)
@@ -27,3 +28,28 @@ async def resolve_building(
         raise HTTPException(status_code=404, detail="Building geometry not found for the specified point")
 
     return schemas.BuildingRecognitionResponse(geometry=geometry, address=address)
+
+
+@router.post("/resolve/batch", response_model=schemas.BatchBuildingRecognitionResponse)
+async def resolve_buildings_batch(
+    request: schemas.BatchBuildingRecognitionRequest,
+) -> schemas.BatchBuildingRecognitionResponse:
+    """Resolve footprints and addresses for many points; errors are reported per item."""
+
+    points = [(point.lat, point.lon) for point in request.points]
+    logger.info("Resolving building geometry for a batch of %d points", len(points))
+    results = await building_detector.resolve_building_geometries(points)
+
+    return schemas.BatchBuildingRecognitionResponse(
+        results=[
+            schemas.BatchBuildingRecognitionItem(
+                index=index,
+                lat=lat,
+                lon=lon,
+                geometry=result.geometry,
+                address=result.address,
+                error=result.error,
+            )
+            for index, ((lat, lon), result) in enumerate(zip(points, results))
+        ]
+    )
@@ -1,32 +1,29 @@
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app import models, schemas
+from app import models, responses, schemas, serialization
 from app.cache import houses_cache
 from app.database import get_db
+from app.profiling import ProfiledRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/comments", tags=["comments"])
+router = APIRouter(prefix="/api/comments", tags=["comments"], route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=List[schemas.CommentRead])
 def read_comments(
+    request: Request,
     house_id: Optional[int] = Query(default=None, description="Filter comments by house"),
     db: Session = Depends(get_db),
-) -> List[schemas.CommentRead]:
+) -> Response:
     logger.debug("Fetching comments for house_id=%s", house_id)
-    query = db.query(models.Comment)
-    if house_id is not None:
-        logger.debug("Filtering comments by house_id=%s", house_id)
-        query = query.filter(models.Comment.house_id == house_id)
-    query = query.order_by(models.Comment.created_at.desc())
-    comments = query.all()
+    comments = serialization.comment_payloads(db, house_id)
     logger.info("Fetched %d comments", len(comments))
-    return [schemas.CommentRead.from_orm(comment) for comment in comments]
+    return responses.negotiated_response(request, comments)
 
 
 @router.post("/", response_model=schemas.CommentRead, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,31 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.warmup import application_started, warmup_state
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+def liveness() -> dict:
+    """Report that the process is up and serving requests."""
+
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness() -> JSONResponse:
+    """Report whether the application accepts traffic and how far cache warmup got."""
+
+    warmup = warmup_state.as_dict()
+    ready = application_started.is_set()
+    if not ready:
+        logger.debug("Readiness probe before startup finished")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "warmup": warmup},
+    )
@@ -1,37 +1,71 @@
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.cache import houses_cache
-from app import models, schemas
+from app import models, responses, schemas, search, stats, warmup
 from app.database import get_db
-from app.services import building_detector
+from app.profiling import ProfiledRoute
+from app.services import building_detector, footprints
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/houses", tags=["houses"])
+router = APIRouter(prefix="/api/houses", tags=["houses"], route_class=ProfiledRoute)
 
 
-@router.get("/", response_model=List[schemas.HouseRead])
-def read_houses(db: Session = Depends(get_db)) -> List[schemas.HouseRead]:
-    cached = houses_cache.get("all")
-    if cached is not None:
-        logger.debug("Returning %d houses from cache", len(cached))
-        return cached
+def _attach_footprints(house: models.House, geometry: Optional[Dict[str, Any]]) -> None:
+    if not geometry:
+        return
+    try:
+        levels = footprints.build_levels(geometry)
+    except ValueError:
+        logger.warning(
+            "Skipping unsupported footprint geometry for lat=%s lon=%s", house.latitude, house.longitude
+        )
+        return
+    house.footprints = [
+        models.HouseFootprint(
+            min_zoom=min_zoom, geometry_type=geometry["type"], encoded=encoded, points=points
+        )
+        for min_zoom, encoded, points in levels
+    ]
 
-    houses = (
-        db.query(models.House)
-        .options(joinedload(models.House.comments))
-        .order_by(models.House.created_at.desc())
-        .all()
-    )
-    logger.info("Fetched %d houses from database", len(houses))
-    result = [schemas.HouseRead.from_orm(house) for house in houses]
-    houses_cache.set("all", result)
-    logger.debug("Stored %d houses in cache", len(result))
-    return result
+
+@router.get("/", response_model=List[schemas.HouseRead])
+def read_houses(request: Request, db: Session = Depends(get_db)) -> Response:
+    media_type = responses.negotiate(request)
+    body_key = f"all:{media_type}"
+    body = houses_cache.get(body_key)
+    if body is not None:
+        logger.debug("Returning encoded houses list from cache")
+        return responses.build_response(body, media_type)
+
+    # The miss on the encoded body was already counted for this request.
+    houses = houses_cache.get("all", record_stats=False)
+    if houses is None:
+        houses = warmup.fetch_houses(db)
+        logger.info("Fetched %d houses from database", len(houses))
+        houses_cache.set("all", houses)
+        logger.debug("Stored %d houses in cache", len(houses))
+
+    body = responses.encode(houses, media_type)
+    houses_cache.set(body_key, body)
+    return responses.build_response(body, media_type)
+
+
+@router.get("/search", response_model=List[schemas.HouseSearchResult])
+def search_houses(
+    q: str = Query(..., min_length=1, max_length=255, description="Address or its prefix"),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_db),
+) -> List[schemas.HouseSearchResult]:
+    """Autocomplete houses by address using the search index."""
+
+    houses = search.search_houses(db, q, limit)
+    logger.debug("Address search for %r returned %d houses", q, len(houses))
+    return [schemas.HouseSearchResult.from_orm(house) for house in houses]
 
 
 @router.get("/{house_id}", response_model=schemas.HouseRead)
@@ -49,15 +83,43 @@ def read_house(house_id: int, db: Session = Depends(get_db)) -> schemas.HouseRea
     return schemas.HouseRead.from_orm(house)
 
 
+@router.get("/{house_id}/footprint", response_model=schemas.HouseFootprintRead)
+def read_house_footprint(
+    house_id: int,
+    zoom: Optional[int] = Query(default=None, ge=0, le=22, description="Map zoom level"),
+    encoding: str = Query(default=footprints.ENCODING_NAME, pattern=r"^(polyline6|geojson)$"),
+    db: Session = Depends(get_db),
+) -> schemas.HouseFootprintRead:
+    """Return the stored building outline simplified for the requested zoom."""
+
+    levels = db.query(models.HouseFootprint).filter(models.HouseFootprint.house_id == house_id).all()
+    level = footprints.select_level(levels, zoom)
+    if level is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Footprint not found")
+
+    if encoding == "geojson":
+        geometry = footprints.decode_geometry(level.geometry_type, level.encoded)
+    else:
+        geometry = {"type": level.geometry_type, "coordinates": level.encoded}
+    return schemas.HouseFootprintRead(
+        house_id=house_id,
+        min_zoom=level.min_zoom,
+        points=level.points,
+        encoding=encoding,
+        geometry=geometry,
+    )
+
+
 @router.post("/", response_model=schemas.HouseRead, status_code=status.HTTP_201_CREATED)
 async def create_house(
     house_in: schemas.HouseCreate, db: Session = Depends(get_db)
 ) -> schemas.HouseRead:
     logger.info("Creating new house entry")
 
+    resolved_geometry = None
     resolved_address = None
     try:
-        _, resolved_address = await building_detector.resolve_building_geometry(
+        resolved_geometry, resolved_address = await building_detector.resolve_building_geometry(
             house_in.latitude, house_in.longitude
         )
     except Exception:  # noqa: BLE001 - best effort enrichment
@@ -87,7 +149,11 @@ async def create_house(
             )
 
     house = models.House(**house_data)
+    _attach_footprints(house, resolved_geometry)
     db.add(house)
+    db.flush()
+    search.index_house(db, house)
+    stats.record_created(db, house)
     db.commit()
     db.refresh(house)
     houses_cache.clear()
@@ -110,10 +176,21 @@ def update_house(house_id: int, house_in: schemas.HouseUpdate, db: Session = Dep
         logger.warning("Attempted to update non-existent house id=%s", house_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="House not found")
 
-    for field, value in house_in.dict(exclude_unset=True).items():
+    before = stats.snapshot(house)
+    changes = house_in.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(house, field, value)
 
+    if any(field in changes for field in ("latitude", "longitude")) and house.footprints:
+        # The stored outline belongs to the old location.
+        house.footprints = []
+        logger.debug("Dropped stale footprint after moving house id=%s", house.id)
+
     db.add(house)
+    if "address" in changes:
+        search.index_house(db, house)
+    db.flush()
+    stats.record_updated(db, before, house)
     db.commit()
     db.refresh(house)
     houses_cache.clear()
@@ -136,7 +213,10 @@ def delete_house(house_id: int, db: Session = Depends(get_db)) -> None:
         logger.warning("Attempted to delete non-existent house id=%s", house_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="House not found")
 
+    before = stats.snapshot(house)
     db.delete(house)
+    search.remove_house(db, house_id)
+    stats.record_deleted(db, before)
     db.commit()
     houses_cache.clear()
     logger.debug("Cache cleared after deleting house id=%s", house_id)
@@ -0,0 +1,19 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics() -> PlainTextResponse:
+    """Expose application metrics in the Prometheus text exposition format."""
+
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
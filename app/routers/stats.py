@@ -0,0 +1,61 @@
+import logging
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import schemas, stats
+from app.database import get_db
+from app.profiling import ProfiledRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/stats", tags=["stats"], route_class=ProfiledRoute)
+
+
+def _parse_bbox(raw: str) -> Tuple[float, float, float, float]:
+    try:
+        south, west, north, east = (float(part) for part in raw.split(","))
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="bbox must be 'south,west,north,east'",
+        ) from exc
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="bbox is out of range or inverted",
+        )
+    return south, west, north, east
+
+
+@router.get("/", response_model=schemas.StatsResponse)
+def read_stats(
+    bucket: str = Query(default="day", pattern=r"^(day|week|month)$"),
+    since: Optional[date] = Query(default=None, description="Only include buckets from this day on"),
+    db: Session = Depends(get_db),
+) -> schemas.StatsResponse:
+    """Totals per status and created/updated counts per time bucket."""
+
+    totals = stats.status_totals(db)
+    return schemas.StatsResponse(
+        total=sum(totals.values()),
+        totals=totals,
+        bucket=bucket,
+        buckets=stats.activity(db, bucket, since),
+    )
+
+
+@router.get("/heatmap", response_model=schemas.HeatmapResponse)
+def read_heatmap(
+    bbox: str = Query(..., description="south,west,north,east in degrees"),
+    zoom: int = Query(..., ge=0, le=22),
+    db: Session = Depends(get_db),
+) -> schemas.HeatmapResponse:
+    """House density per grid cell for the visible map area."""
+
+    south, west, north, east = _parse_bbox(bbox)
+    level, cells = stats.heatmap(db, south, west, north, east, zoom)
+    logger.debug("Heatmap for zoom=%s uses level %s with %d cells", zoom, level, len(cells))
+    return schemas.HeatmapResponse(zoom=zoom, level=level, cells=cells)
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Any, List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, validator
 
@@ -74,6 +74,16 @@ class HouseRead(HouseBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class HouseSearchResult(BaseModel):
+    id: int
+    address: str
+    latitude: float
+    longitude: float
+    status: HouseStatus
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class BuildingGeometry(BaseModel):
     type: str = Field(..., pattern=r"^(Polygon|MultiPolygon)$")
     coordinates: Any
@@ -82,3 +92,69 @@ class BuildingGeometry(BaseModel):
 class BuildingRecognitionResponse(BaseModel):
     geometry: Optional[BuildingGeometry]
     address: Optional[str]
+
+
+class BuildingPoint(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lon: float = Field(..., ge=-180.0, le=180.0)
+
+
+class BatchBuildingRecognitionRequest(BaseModel):
+    points: List[BuildingPoint] = Field(..., min_length=1, max_length=500)
+
+
+class BatchBuildingRecognitionItem(BaseModel):
+    index: int
+    lat: float
+    lon: float
+    geometry: Optional[BuildingGeometry] = None
+    address: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchBuildingRecognitionResponse(BaseModel):
+    results: List[BatchBuildingRecognitionItem]
+
+
+class HouseFootprintRead(BaseModel):
+    house_id: int
+    min_zoom: int
+    points: int
+    encoding: str = Field(..., pattern=r"^(polyline6|geojson)$")
+    geometry: BuildingGeometry
+
+
+class ProfileInfo(BaseModel):
+    name: str
+    size: int
+    created_at: datetime
+
+
+class ActivityBucket(BaseModel):
+    start: date
+    created: Dict[str, int]
+    updated: Dict[str, int]
+
+
+class StatsResponse(BaseModel):
+    total: int
+    totals: Dict[str, int]
+    bucket: str
+    buckets: List[ActivityBucket]
+
+
+class HeatmapCell(BaseModel):
+    x: int
+    y: int
+    south: float
+    west: float
+    north: float
+    east: float
+    count: int
+    statuses: Dict[str, int]
+
+
+class HeatmapResponse(BaseModel):
+    zoom: int
+    level: int
+    cells: List[HeatmapCell]
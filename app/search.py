@@ -0,0 +1,190 @@
+"""Indexed address search for houses.
+
+SQLite databases get an FTS5 table (``houses_fts``) keyed by house id with
+prefix indexes for autocomplete; PostgreSQL gets a ``pg_trgm`` GIN index on
+the normalized address, which also serves the word-start regular expressions
+used for matching. Other backends fall back to ``LIKE`` scans. Every backend
+matches each query word as a prefix of some address word. The FTS5 table is
+kept in sync explicitly by the house write paths.
+"""
+
+import logging
+import re
+from typing import List
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "houses_fts"
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# FTS5 ``rank`` scores every match before LIMIT applies, which is slow for the
+# first keystrokes of a common prefix. Only the newest candidates are ranked.
+FTS_CANDIDATE_LIMIT = 200
+
+# Resolved by ``ensure_search_index``: "fts5", "trigram" or "like".
+_backend = "like"
+
+
+def normalize(value: str) -> str:
+    """Lower-case and fold ``ё`` so that both spellings of an address match."""
+
+    return value.lower().replace("ё", "е")
+
+
+def _tokens(query: str) -> List[str]:
+    return TOKEN_PATTERN.findall(normalize(query))
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the search index for the current backend, backfilling it when new."""
+
+    global _backend
+
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        if dialect == "sqlite":
+            _backend = "fts5" if _ensure_fts5(connection) else "like"
+        elif dialect == "postgresql":
+            _backend = "trigram" if _ensure_trigram(connection) else "like"
+        else:
+            _backend = "like"
+    logger.info("Address search backend: %s", _backend)
+
+
+def _ensure_fts5(connection: Connection) -> bool:
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    if exists:
+        return True
+
+    try:
+        connection.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "address, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+            )
+        )
+    except OperationalError:
+        logger.warning("SQLite was built without FTS5, address search falls back to LIKE")
+        return False
+
+    _rebuild_fts5(connection)
+    return True
+
+
+def _rebuild_fts5(connection: Connection) -> None:
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    rows = connection.execute(text("SELECT id, address FROM houses")).all()
+    if rows:
+        connection.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, address) VALUES (:id, :address)"),
+            [{"id": house_id, "address": normalize(address)} for house_id, address in rows],
+        )
+    logger.info("Indexed %d house addresses for search", len(rows))
+
+
+def _ensure_trigram(connection: Connection) -> bool:
+    try:
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_houses_address_trgm "
+                    "ON houses USING gin (replace(lower(address), 'ё', 'е') gin_trgm_ops)"
+                )
+            )
+    except (OperationalError, ProgrammingError):
+        logger.warning("pg_trgm is unavailable, address search falls back to LIKE")
+        return False
+    return True
+
+
+def rebuild_index(db: Session) -> None:
+    """Re-index every house; for bulk loads that bypass the API."""
+
+    if _backend == "fts5":
+        _rebuild_fts5(db.connection())
+
+
+def index_house(db: Session, house: models.House) -> None:
+    """Add or refresh ``house`` in the index. The house must already have an id."""
+
+    if _backend != "fts5":
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": house.id})
+    db.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, address) VALUES (:id, :address)"),
+        {"id": house.id, "address": normalize(house.address)},
+    )
+
+
+def remove_house(db: Session, house_id: int) -> None:
+    if _backend != "fts5":
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": house_id})
+
+
+def search_houses(db: Session, query: str, limit: int = 10) -> List[models.House]:
+    """Return houses whose address contains every word of ``query`` as a prefix.
+
+    With FTS5 the best matches among the newest ``FTS_CANDIDATE_LIMIT``
+    matching houses are returned, so broad prefixes stay fast.
+    """
+
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    if _backend == "fts5":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        rows = db.execute(
+            text(
+                f"SELECT rowid FROM (SELECT rowid, bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH :match ORDER BY rowid DESC LIMIT :candidates) "
+                "ORDER BY score LIMIT :limit"
+            ),
+            {"match": match, "candidates": max(limit, FTS_CANDIDATE_LIMIT), "limit": limit},
+        )
+        return _houses_in_order(db, [row[0] for row in rows])
+
+    # Same expression as the trigram index, so PostgreSQL can use it for the filters.
+    searchable = func.replace(func.lower(models.House.address), "ё", "е")
+    houses = db.query(models.House)
+    if _backend == "trigram":
+        # Tokens only contain word characters, so they need no regex escaping.
+        for token in tokens:
+            houses = houses.filter(searchable.op("~")(f"\\m{token}"))
+        houses = houses.order_by(func.similarity(searchable, " ".join(tokens)).desc())
+        return houses.limit(limit).all()
+
+    # LIKE can only express substrings; word-prefix matches are checked in Python.
+    for token in tokens:
+        escaped = token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        houses = houses.filter(searchable.like(f"%{escaped}%", escape="\\"))
+    results: List[models.House] = []
+    for house in houses.order_by(models.House.address).yield_per(500):
+        if _matches_word_prefixes(house.address, tokens):
+            results.append(house)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _matches_word_prefixes(address: str, tokens: List[str]) -> bool:
+    words = _tokens(address)
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def _houses_in_order(db: Session, ids: List[int]) -> List[models.House]:
+    if not ids:
+        return []
+    by_id = {house.id: house for house in db.query(models.House).filter(models.House.id.in_(ids))}
+    return [by_id[house_id] for house_id in ids if house_id in by_id]
+
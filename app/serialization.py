@@ -0,0 +1,100 @@
+"""Row-level builders for list payloads.
+
+These produce the same JSON shape as ``schemas.HouseRead`` and
+``schemas.CommentRead`` without materialising ORM objects or Pydantic models,
+which dominates CPU time for the full houses list.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Comment, House, HouseStatus
+
+PROGRESS_EVERY = 500
+HOUSE_PAYLOAD_KEYS = frozenset(
+    {"id", "address", "latitude", "longitude", "status", "created_at", "updated_at", "comments"}
+)
+COMMENT_PAYLOAD_KEYS = frozenset({"id", "house_id", "text", "author", "created_at"})
+
+
+def _comment_payload(row: Any) -> Dict[str, Any]:
+    comment_id, house_id, text, author, created_at = row
+    return {
+        "text": text,
+        "author": author,
+        "id": comment_id,
+        "house_id": house_id,
+        "created_at": created_at.isoformat(),
+    }
+
+
+def _comment_columns() -> tuple:
+    return Comment.id, Comment.house_id, Comment.text, Comment.author, Comment.created_at
+
+
+def house_payloads(db: Session, progress: Optional[Callable[[int], None]] = None) -> List[Dict[str, Any]]:
+    """All houses with their comments, newest first.
+
+    ``progress`` is called with the number of houses built so far every
+    ``PROGRESS_EVERY`` houses.
+    """
+
+    comments_by_house: Dict[int, List[Dict[str, Any]]] = {}
+    for row in db.query(*_comment_columns()).order_by(Comment.id):
+        comments_by_house.setdefault(row[1], []).append(_comment_payload(row))
+
+    rows = (
+        db.query(
+            House.id,
+            House.address,
+            House.latitude,
+            House.longitude,
+            House.status,
+            House.created_at,
+            House.updated_at,
+        )
+        .order_by(House.created_at.desc())
+        .yield_per(1000)
+    )
+    houses: List[Dict[str, Any]] = []
+    for house_id, address, latitude, longitude, house_status, created_at, updated_at in rows:
+        houses.append(
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "status": HouseStatus(house_status).value,
+                "address": address,
+                "id": house_id,
+                "created_at": created_at.isoformat(),
+                "updated_at": updated_at.isoformat(),
+                "comments": comments_by_house.get(house_id, []),
+            }
+        )
+        if progress is not None and len(houses) % PROGRESS_EVERY == 0:
+            progress(len(houses))
+    return houses
+
+
+def is_house_payload(item: Any) -> bool:
+    """Cheap shape check for payloads read back from outside the database."""
+
+    return (
+        isinstance(item, dict)
+        and HOUSE_PAYLOAD_KEYS <= item.keys()
+        and isinstance(item["id"], int)
+        and isinstance(item["comments"], list)
+        and all(
+            isinstance(comment, dict) and COMMENT_PAYLOAD_KEYS <= comment.keys()
+            for comment in item["comments"]
+        )
+    )
+
+
+def comment_payloads(db: Session, house_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Comments, optionally for a single house, newest first."""
+
+    query = db.query(*_comment_columns())
+    if house_id is not None:
+        query = query.filter(Comment.house_id == house_id)
+    return [_comment_payload(row) for row in query.order_by(Comment.created_at.desc())]
@@ -1,14 +1,19 @@
+import asyncio
 import logging
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import httpx
 
+from app.metrics import track_upstream
 from app.services import yandex_maps
 
 logger = logging.getLogger(__name__)
 
-OVERPASS_API_URL = "https://overpass-api.de/api/interpreter"
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+OVERPASS_API_URL = os.getenv("OVERPASS_API_URL", "https://overpass-api.de/api/interpreter")
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse")
 OVERPASS_QUERY_TEMPLATE = (
     "[out:json][timeout:25];"
     "("  # start union
@@ -17,39 +22,205 @@ OVERPASS_QUERY_TEMPLATE = (
     ");"
     "out geom;"
 )
+OVERPASS_BBOX_QUERY_TEMPLATE = (
+    "[out:json][timeout:25];"
+    "("  # start union
+    "way[\"building\"]({south},{west},{north},{east});"
+    "relation[\"building\"]({south},{west},{north},{east});"
+    ");"
+    "out geom;"
+)
+SEARCH_RADIUS_METERS = 30
+METERS_PER_DEGREE_LAT = 111_320
+# Points of a batch that fall into the same grid cell share one Overpass query.
+BATCH_CLUSTER_SIZE_DEGREES = 0.005
+BATCH_OVERPASS_CONCURRENCY = int(os.getenv("BATCH_OVERPASS_CONCURRENCY", "2"))
+BATCH_GEOCODE_CONCURRENCY = int(os.getenv("BATCH_GEOCODE_CONCURRENCY", "4"))
 
 
 class BuildingRecognitionError(RuntimeError):
     """Raised when building recognition fails."""
 
 
+@dataclass
+class BatchResolveResult:
+    geometry: Optional[Dict[str, Any]] = None
+    address: Optional[str] = None
+    error: Optional[str] = None
+
+
 async def resolve_building_geometry(lat: float, lon: float) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """Fetch building geometry and a human-readable address for the point."""
 
     geometries = await _fetch_overpass_geometries(lat, lon)
-    selected_geometry: Optional[Dict[str, Any]] = None
-
-    for geometry in geometries:
-        if _geometry_contains_point(geometry, (lat, lon)):
-            selected_geometry = geometry
-            break
-
-    if selected_geometry is None and geometries:
-        selected_geometry = geometries[0]
+    selected_geometry = _select_geometry((lat, lon), geometries)
 
     address = await _reverse_geocode(lat, lon)
 
     return selected_geometry, address
 
 
+async def resolve_building_geometries(points: Sequence[Tuple[float, float]]) -> List[BatchResolveResult]:
+    """Resolve footprints and addresses for many points with as few upstream calls as possible.
+
+    Nearby points are clustered into one Overpass bounding-box query per
+    cluster, and reverse geocoding runs with bounded concurrency. Results are
+    returned in input order; failures are reported per point.
+    """
+
+    results = [BatchResolveResult() for _ in points]
+    clusters: Dict[Tuple[int, int], List[int]] = {}
+    for index, (lat, lon) in enumerate(points):
+        key = (math.floor(lat / BATCH_CLUSTER_SIZE_DEGREES), math.floor(lon / BATCH_CLUSTER_SIZE_DEGREES))
+        clusters.setdefault(key, []).append(index)
+    logger.debug("Resolving %d points in %d Overpass clusters", len(points), len(clusters))
+
+    overpass_semaphore = asyncio.Semaphore(BATCH_OVERPASS_CONCURRENCY)
+
+    async def resolve_cluster(indexes: List[int]) -> None:
+        cluster_points = [points[index] for index in indexes]
+        try:
+            async with overpass_semaphore:
+                geometries = await _run_overpass_query(
+                    OVERPASS_BBOX_QUERY_TEMPLATE.format(**_cluster_bbox(cluster_points))
+                )
+        except Exception:  # noqa: BLE001 - reported per point
+            logger.exception("Overpass query failed for a cluster of %d points", len(indexes))
+            for index in indexes:
+                results[index].error = "Failed to resolve building geometry"
+            return
+
+        for index, geometry in zip(indexes, _assign_geometries(cluster_points, geometries)):
+            if geometry is None:
+                results[index].error = "Building geometry not found for the specified point"
+            else:
+                results[index].geometry = geometry
+
+    await asyncio.gather(*(resolve_cluster(indexes) for indexes in clusters.values()))
+
+    geocode_semaphore = asyncio.Semaphore(BATCH_GEOCODE_CONCURRENCY)
+    geocoded: Dict[Tuple[float, float], "asyncio.Task[Optional[str]]"] = {}
+
+    async def geocode(lat: float, lon: float) -> Optional[str]:
+        async with geocode_semaphore:
+            return await _reverse_geocode(lat, lon)
+
+    async def resolve_address(index: int) -> None:
+        lat, lon = points[index]
+        key = (round(lat, 6), round(lon, 6))
+        if key not in geocoded:
+            geocoded[key] = asyncio.ensure_future(geocode(lat, lon))
+        try:
+            results[index].address = await geocoded[key]
+        except Exception:  # noqa: BLE001 - address is best effort
+            logger.exception("Reverse geocoding failed for lat=%s lon=%s", lat, lon)
+
+    await asyncio.gather(
+        *(resolve_address(index) for index, result in enumerate(results) if result.geometry is not None)
+    )
+    return results
+
+
+def _cluster_bbox(points: Sequence[Tuple[float, float]]) -> Dict[str, float]:
+    lats = [lat for lat, _ in points]
+    lons = [lon for _, lon in points]
+    pad_lat = SEARCH_RADIUS_METERS / METERS_PER_DEGREE_LAT
+    pad_lon = pad_lat / max(math.cos(math.radians(max(abs(lat) for lat in lats))), 0.01)
+    return {
+        "south": round(min(lats) - pad_lat, 7),
+        "west": round(min(lons) - pad_lon, 7),
+        "north": round(max(lats) + pad_lat, 7),
+        "east": round(max(lons) + pad_lon, 7),
+    }
+
+
+def _geometry_bbox(geometry: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    coordinates = geometry.get("coordinates") or []
+    polygons = [coordinates] if geometry.get("type") == "Polygon" else coordinates
+    outer_points = [point for polygon in polygons if polygon for point in polygon[0]]
+    lats = [lat for lat, _ in outer_points]
+    lons = [lon for _, lon in outer_points]
+    return min(lats), min(lons), max(lats), max(lons)
+
+
+def _select_geometry(
+    point: Tuple[float, float],
+    geometries: Sequence[Dict[str, Any]],
+    boxes: Optional[Sequence[Tuple[float, float, float, float]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Pick the footprint for ``point``; shared by the single-point and batch paths.
+
+    The first footprint containing the point wins. Otherwise the footprint
+    whose outline is closest to the point is used, provided it lies within
+    ``SEARCH_RADIUS_METERS`` (the radius of the single-point ``around`` query).
+    Bounding boxes, when given, let the exact tests skip far-away candidates.
+    """
+
+    lat, lon = point
+    if boxes is None:
+        boxes = [_geometry_bbox(geometry) for geometry in geometries]
+    lon_scale = METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+
+    nearby: List[Tuple[float, Dict[str, Any]]] = []
+    for geometry, (south, west, north, east) in zip(geometries, boxes):
+        dlat = max(south - lat, 0.0, lat - north) * METERS_PER_DEGREE_LAT
+        dlon = max(west - lon, 0.0, lon - east) * lon_scale
+        if dlat == 0 and dlon == 0 and _geometry_contains_point(geometry, point):
+            return geometry
+        # The bounding box distance is a lower bound for the outline distance.
+        if math.hypot(dlat, dlon) <= SEARCH_RADIUS_METERS:
+            nearby.append((math.hypot(dlat, dlon), geometry))
+
+    selected: Optional[Dict[str, Any]] = None
+    nearest_distance = float(SEARCH_RADIUS_METERS)
+    for _, geometry in sorted(nearby, key=lambda item: item[0]):
+        distance = _distance_to_outline(geometry, point, lon_scale)
+        if distance <= nearest_distance:
+            selected, nearest_distance = geometry, distance
+    return selected
+
+
+def _distance_to_outline(geometry: Dict[str, Any], point: Tuple[float, float], lon_scale: float) -> float:
+    """Distance in meters from ``point`` to the nearest edge of any ring of ``geometry``."""
+
+    lat, lon = point
+    coordinates = geometry.get("coordinates") or []
+    polygons = [coordinates] if geometry.get("type") == "Polygon" else coordinates
+    nearest = math.inf
+    for polygon in polygons:
+        for ring in polygon or []:
+            projected = [
+                ((ring_lat - lat) * METERS_PER_DEGREE_LAT, (ring_lon - lon) * lon_scale)
+                for ring_lat, ring_lon in ring
+            ]
+            for (ay, ax), (by, bx) in zip(projected, projected[1:]):
+                dy, dx = by - ay, bx - ax
+                length = dy * dy + dx * dx
+                t = 0.0 if length == 0 else max(0.0, min(1.0, -(ay * dy + ax * dx) / length))
+                nearest = min(nearest, math.hypot(ay + t * dy, ax + t * dx))
+    return nearest
+
+
+def _assign_geometries(
+    points: Sequence[Tuple[float, float]], geometries: Sequence[Dict[str, Any]]
+) -> List[Optional[Dict[str, Any]]]:
+    """Apply ``_select_geometry`` to every point, computing bounding boxes only once."""
+
+    boxes = [_geometry_bbox(geometry) for geometry in geometries]
+    return [_select_geometry(point, geometries, boxes) for point in points]
+
+
 async def _fetch_overpass_geometries(lat: float, lon: float) -> List[Dict[str, Any]]:
-    query = OVERPASS_QUERY_TEMPLATE.format(lat=lat, lon=lon)
     logger.debug("Requesting Overpass data for coordinates lat=%s lon=%s", lat, lon)
+    return await _run_overpass_query(OVERPASS_QUERY_TEMPLATE.format(lat=lat, lon=lon))
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.post(OVERPASS_API_URL, content=query)
 
-    response.raise_for_status()
+async def _run_overpass_query(query: str) -> List[Dict[str, Any]]:
+    with track_upstream("overpass"):
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.post(OVERPASS_API_URL, content=query)
+        response.raise_for_status()
+
     payload = response.json()
     elements = payload.get("elements", []) if isinstance(payload, dict) else []
 
@@ -82,9 +253,10 @@ async def _reverse_geocode_nominatim(lat: float, lon: float) -> Optional[str]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15, headers=headers) as client:
-            response = await client.get(NOMINATIM_URL, params=params)
-        response.raise_for_status()
+        with track_upstream("nominatim"):
+            async with httpx.AsyncClient(timeout=15, headers=headers) as client:
+                response = await client.get(NOMINATIM_URL, params=params)
+            response.raise_for_status()
         data = response.json()
     except httpx.HTTPError as exc:
         logger.warning(
@@ -0,0 +1,241 @@
+"""Compact storage of building footprints at several levels of detail.
+
+Footprints are stored as Google encoded polylines with 1e-6 precision: rings
+are separated by ``,`` and polygons by ``;`` (neither character is produced by
+the polyline alphabet), and the closing vertex of each ring is implied. Every
+zoom band gets its own Douglas-Peucker simplified copy so that the map only
+downloads the detail it can actually draw.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[float, float]
+Ring = List[Point]
+
+POLYLINE_PRECISION = 1_000_000
+ENCODING_NAME = "polyline6"
+RING_SEPARATOR = ","
+POLYGON_SEPARATOR = ";"
+
+# (minimum zoom, Douglas-Peucker tolerance in degrees). Ordered from the
+# coarsest to the most detailed level; zoom 17+ keeps every vertex.
+FOOTPRINT_LEVELS: Tuple[Tuple[int, float], ...] = (
+    (0, 0.0002),
+    (13, 0.00005),
+    (15, 0.00001),
+    (17, 0.0),
+)
+
+
+def _perpendicular_distance(point: Point, start: Point, end: Point) -> float:
+    (px, py), (sx, sy), (ex, ey) = point, start, end
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return ((px - sx) ** 2 + (py - sy) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)))
+    return ((px - sx - t * dx) ** 2 + (py - sy - t * dy) ** 2) ** 0.5
+
+
+def simplify_ring(ring: Sequence[Point], tolerance: float) -> Optional[Ring]:
+    """Douglas-Peucker simplification of a closed ring; ``None`` when it collapses.
+
+    Collapsing means fewer than three distinct vertices are left, which is
+    typical for small buildings at the coarse tolerances.
+    """
+
+    points = [tuple(point) for point in ring]
+    if tolerance <= 0 or len(points) <= 4:
+        return list(points)
+
+    # Split the closed ring at the vertex farthest from the start so that both
+    # halves are simplified as open polylines with fixed endpoints.
+    start = points[0]
+    split = max(
+        range(1, len(points) - 1),
+        key=lambda index: _perpendicular_distance(points[index], start, start),
+    )
+    keep = [False] * len(points)
+    keep[0] = keep[split] = keep[-1] = True
+
+    stack = [(0, split), (split, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance = 0.0
+        index = first
+        for candidate in range(first + 1, last):
+            distance = _perpendicular_distance(points[candidate], points[first], points[last])
+            if distance > max_distance:
+                index, max_distance = candidate, distance
+        if max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    simplified = [point for point, kept in zip(points, keep) if kept]
+    if len(simplified) < 4:
+        return None
+    return simplified
+
+
+def _minimal_ring(ring: Sequence[Point]) -> Ring:
+    """The largest-spread triangle of ``ring``, closed; stands in for a collapsed outer ring."""
+
+    points = [tuple(point) for point in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    if len(points) <= 3:
+        return points + points[:1]
+
+    start = points[0]
+    far = max(points, key=lambda point: _perpendicular_distance(point, start, start))
+    third = max(points, key=lambda point: _perpendicular_distance(point, start, far))
+    triangle = [point for point in points if point in (start, far, third)][:3]
+    return triangle + triangle[:1]
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[Ring]]:
+    if geometry.get("type") == "Polygon":
+        return [geometry.get("coordinates") or []]
+    if geometry.get("type") == "MultiPolygon":
+        return list(geometry.get("coordinates") or [])
+    raise ValueError(f"Unsupported geometry type: {geometry.get('type')!r}")
+
+
+def simplify_geometry(geometry: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Simplify every ring; holes that collapse are dropped, outer rings are kept as-is."""
+
+    polygons: List[List[Ring]] = []
+    for polygon in _polygons(geometry):
+        if not polygon:
+            continue
+        outer = simplify_ring(polygon[0], tolerance) or _minimal_ring(polygon[0])
+        holes = [ring for ring in (simplify_ring(hole, tolerance) for hole in polygon[1:]) if ring]
+        polygons.append([outer, *holes])
+
+    if geometry.get("type") == "Polygon":
+        return {"type": "Polygon", "coordinates": polygons[0] if polygons else []}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _encode_value(value: int) -> str:
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def encode_ring(ring: Sequence[Point]) -> str:
+    points = list(ring)
+    if len(points) > 1 and tuple(points[0]) == tuple(points[-1]):
+        points = points[:-1]
+
+    encoded = []
+    previous_lat = previous_lon = 0
+    for lat, lon in points:
+        lat_value = int(round(lat * POLYLINE_PRECISION))
+        lon_value = int(round(lon * POLYLINE_PRECISION))
+        encoded.append(_encode_value(lat_value - previous_lat))
+        encoded.append(_encode_value(lon_value - previous_lon))
+        previous_lat, previous_lon = lat_value, lon_value
+    return "".join(encoded)
+
+
+def decode_ring(encoded: str) -> Ring:
+    values: List[int] = []
+    index = 0
+    while index < len(encoded):
+        result = shift = 0
+        while True:
+            byte = ord(encoded[index]) - 63
+            index += 1
+            result |= (byte & 0x1F) << shift
+            shift += 5
+            if byte < 0x20:
+                break
+        values.append(~(result >> 1) if result & 1 else result >> 1)
+
+    ring: Ring = []
+    lat = lon = 0
+    for lat_delta, lon_delta in zip(values[0::2], values[1::2]):
+        lat += lat_delta
+        lon += lon_delta
+        ring.append((lat / POLYLINE_PRECISION, lon / POLYLINE_PRECISION))
+    if ring:
+        ring.append(ring[0])
+    return ring
+
+
+def encode_geometry(geometry: Dict[str, Any]) -> str:
+    return POLYGON_SEPARATOR.join(
+        RING_SEPARATOR.join(encode_ring(ring) for ring in polygon) for polygon in _polygons(geometry)
+    )
+
+
+def decode_geometry(geometry_type: str, encoded: str) -> Dict[str, Any]:
+    polygons = [
+        [decode_ring(ring) for ring in polygon.split(RING_SEPARATOR)]
+        for polygon in encoded.split(POLYGON_SEPARATOR)
+        if polygon
+    ]
+    if geometry_type == "Polygon":
+        return {"type": "Polygon", "coordinates": polygons[0] if polygons else []}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _count_points(geometry: Dict[str, Any]) -> int:
+    return sum(len(ring) for polygon in _polygons(geometry) for ring in polygon)
+
+
+def build_levels(geometry: Dict[str, Any]) -> List[Tuple[int, str, int]]:
+    """Return ``(min_zoom, encoded, points)`` for each distinct level of detail.
+
+    A level identical to the coarser one before it is skipped, since the
+    coarser row already covers its zoom band.
+    """
+
+    candidates: List[Tuple[int, str, int]] = []
+    for min_zoom, tolerance in FOOTPRINT_LEVELS:
+        simplified = simplify_geometry(geometry, tolerance)
+        candidates.append((min_zoom, encode_geometry(simplified), _count_points(simplified)))
+
+    # A coarser band must never carry more points than a finer one; reuse the
+    # finer encoding if simplification happened to keep more vertices.
+    for index in range(len(candidates) - 2, -1, -1):
+        min_zoom, _, points = candidates[index]
+        finer = candidates[index + 1]
+        if points > finer[2]:
+            candidates[index] = (min_zoom, finer[1], finer[2])
+
+    levels: List[Tuple[int, str, int]] = []
+    for level in candidates:
+        if levels and levels[-1][1] == level[1]:
+            continue
+        levels.append(level)
+
+    logger.debug(
+        "Built %d footprint levels with %s points",
+        len(levels),
+        [points for _, _, points in levels],
+    )
+    return levels
+
+
+def select_level(levels: Sequence[Any], zoom: Optional[int]) -> Optional[Any]:
+    """Pick the most detailed level whose ``min_zoom`` does not exceed ``zoom``."""
+
+    if not levels:
+        return None
+    ordered = sorted(levels, key=lambda level: level.min_zoom)
+    if zoom is None:
+        return ordered[-1]
+    selected = ordered[0]
+    for level in ordered:
+        if level.min_zoom <= zoom:
+            selected = level
+    return selected
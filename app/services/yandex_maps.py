@@ -8,9 +8,11 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from app.metrics import track_upstream
+
 logger = logging.getLogger(__name__)
 
-YANDEX_GEOCODER_URL = "https://geocode-maps.yandex.ru/1.x"
+YANDEX_GEOCODER_URL = os.getenv("YANDEX_GEOCODER_URL", "https://geocode-maps.yandex.ru/1.x")
 YANDEX_MAPS_API_KEY = os.getenv("YANDEX_MAPS_API_KEY", "")
 
 
@@ -60,9 +62,10 @@ async def reverse_geocode(lat: float, lon: float) -> Optional[str]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10, headers=headers) as client:
-            response = await client.get(YANDEX_GEOCODER_URL, params=params)
-        response.raise_for_status()
+        with track_upstream("yandex"):
+            async with httpx.AsyncClient(timeout=10, headers=headers) as client:
+                response = await client.get(YANDEX_GEOCODER_URL, params=params)
+            response.raise_for_status()
     except httpx.HTTPError as exc:  # pragma: no cover - network failure
         logger.warning(
             "Yandex Maps reverse geocoding failed for lat=%s lon=%s: %s",
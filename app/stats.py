@@ -0,0 +1,289 @@
+"""Incrementally maintained house statistics.
+
+Three aggregate tables are updated by the house write paths in the same
+transaction as the write itself, so dashboards read a handful of rows instead
+of scanning ``houses``:
+
+* ``house_status_totals`` - number of houses per status;
+* ``house_activity_buckets`` - per day and status, how many of the current
+  houses were created that day (``created``) and how many updates landed
+  that day (``updated``, by the status after the update);
+* ``house_heatmap_cells`` - house counts per web-mercator tile and status for
+  the levels in ``HEATMAP_LEVELS``.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import HouseStatus
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_LEVELS: Tuple[int, ...] = (4, 6, 8, 10, 12, 14, 16)
+# Cells are this many tile levels finer than the map zoom, i.e. up to 8x8
+# cells per visible 256px tile.
+HEATMAP_LEVEL_OFFSET = 3
+# Upper bound on cells per heatmap response; large bounding boxes fall back to
+# coarser levels so the response size does not depend on the table size.
+MAX_HEATMAP_CELLS = 1024
+MAX_MERCATOR_LAT = 85.05112878
+BUCKET_SIZES = ("day", "week", "month")
+
+
+class HouseSnapshot(NamedTuple):
+    status: HouseStatus
+    latitude: float
+    longitude: float
+    created_at: Optional[datetime]
+    address: str
+
+
+def snapshot(house: models.House) -> HouseSnapshot:
+    """Capture the editable fields of a house before it is modified."""
+
+    return HouseSnapshot(
+        HouseStatus(house.status), house.latitude, house.longitude, house.created_at, house.address
+    )
+
+
+def tile_for(lat: float, lon: float, level: int) -> Tuple[int, int]:
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    scale = 1 << level
+    x = int((lon + 180.0) / 360.0 * scale)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def tile_bounds(x: int, y: int, level: int) -> Tuple[float, float, float, float]:
+    """Return ``(south, west, north, east)`` of a tile."""
+
+    scale = 1 << level
+
+    def tile_lat(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / scale))))
+
+    return tile_lat(y + 1), x / scale * 360.0 - 180.0, tile_lat(y), (x + 1) / scale * 360.0 - 180.0
+
+
+def _increment(db: Session, model: Any, keys: Dict[str, Any], **deltas: int) -> None:
+    """Add ``deltas`` to the row identified by ``keys``, creating it when missing."""
+
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in {"sqlite", "postgresql"}:
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        initial = {column: max(delta, 0) for column, delta in deltas.items()}
+        statement = insert(table).values(**keys, **initial).on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + delta for column, delta in deltas.items()},
+        )
+        db.execute(statement)
+        return
+
+    values = {table.c[column]: table.c[column] + delta for column, delta in deltas.items()}
+    if not db.query(model).filter_by(**keys).update(values, synchronize_session=False):
+        db.add(model(**keys, **{column: max(delta, 0) for column, delta in deltas.items()}))
+        db.flush()
+
+
+def _apply_house(
+    db: Session, status: HouseStatus, lat: float, lon: float, created_day: date, delta: int
+) -> None:
+    _increment(db, models.HouseStatusTotal, {"status": status}, count=delta)
+    _increment(db, models.HouseActivityBucket, {"day": created_day, "status": status}, created=delta)
+    for level in HEATMAP_LEVELS:
+        x, y = tile_for(lat, lon, level)
+        keys = {"level": level, "x": x, "y": y, "status": status}
+        _increment(db, models.HouseHeatmapCell, keys, count=delta)
+
+
+def _day(value: Optional[datetime]) -> date:
+    return (value or datetime.utcnow()).date()
+
+
+def record_created(db: Session, house: models.House) -> None:
+    _apply_house(db, HouseStatus(house.status), house.latitude, house.longitude, _day(house.created_at), 1)
+
+
+def record_updated(db: Session, before: HouseSnapshot, house: models.House) -> None:
+    after = snapshot(house)
+    if after == before:
+        # Nothing changed, so no UPDATE was issued and updated_at is still old.
+        return
+    if after[:3] != before[:3]:
+        created_day = _day(before.created_at)
+        _apply_house(db, before.status, before.latitude, before.longitude, created_day, -1)
+        _apply_house(db, after.status, after.latitude, after.longitude, created_day, 1)
+    _increment(
+        db,
+        models.HouseActivityBucket,
+        {"day": _day(house.updated_at), "status": after.status},
+        updated=1,
+    )
+
+
+def record_deleted(db: Session, before: HouseSnapshot) -> None:
+    _apply_house(db, before.status, before.latitude, before.longitude, _day(before.created_at), -1)
+
+
+def rebuild(db: Session) -> None:
+    """Recompute every aggregate from ``houses`` with a full scan.
+
+    Only the latest update of each house is known at this point, so the
+    ``updated`` counters are approximated by one update on ``updated_at``.
+    """
+
+    for model in (models.HouseStatusTotal, models.HouseActivityBucket, models.HouseHeatmapCell):
+        db.query(model).delete(synchronize_session=False)
+
+    totals: Dict[HouseStatus, int] = defaultdict(int)
+    buckets: Dict[Tuple[date, HouseStatus], List[int]] = defaultdict(lambda: [0, 0])
+    cells: Dict[Tuple[int, int, int, HouseStatus], int] = defaultdict(int)
+    rows = db.query(
+        models.House.status,
+        models.House.latitude,
+        models.House.longitude,
+        models.House.created_at,
+        models.House.updated_at,
+    )
+    for status, lat, lon, created_at, updated_at in rows:
+        status = HouseStatus(status)
+        totals[status] += 1
+        buckets[(_day(created_at), status)][0] += 1
+        if updated_at and created_at and updated_at > created_at:
+            buckets[(_day(updated_at), status)][1] += 1
+        for level in HEATMAP_LEVELS:
+            x, y = tile_for(lat, lon, level)
+            cells[(level, x, y, status)] += 1
+
+    db.add_all(models.HouseStatusTotal(status=status, count=count) for status, count in totals.items())
+    db.add_all(
+        models.HouseActivityBucket(day=day, status=status, created=created, updated=updated)
+        for (day, status), (created, updated) in buckets.items()
+    )
+    db.add_all(
+        models.HouseHeatmapCell(level=level, x=x, y=y, status=status, count=count)
+        for (level, x, y, status), count in cells.items()
+    )
+    db.flush()
+    logger.info("Rebuilt house statistics for %d houses", sum(totals.values()))
+
+
+def backfill_if_empty(db: Session) -> None:
+    """Build the aggregates once for databases that predate them."""
+
+    if db.query(models.HouseStatusTotal).first() is not None:
+        return
+    if db.query(models.House.id).first() is None:
+        return
+    rebuild(db)
+    db.commit()
+
+
+def status_totals(db: Session) -> Dict[str, int]:
+    totals = {status.value: 0 for status in HouseStatus}
+    for total in db.query(models.HouseStatusTotal):
+        totals[HouseStatus(total.status).value] = total.count
+    return totals
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def activity(db: Session, bucket: str = "day", since: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Return created/updated counts per status grouped into ``bucket`` periods."""
+
+    query = db.query(models.HouseActivityBucket)
+    if since is not None:
+        query = query.filter(models.HouseActivityBucket.day >= since)
+
+    grouped: Dict[date, Dict[str, Dict[str, int]]] = {}
+    for row in query.order_by(models.HouseActivityBucket.day):
+        start = _bucket_start(row.day, bucket)
+        entry = grouped.setdefault(
+            start,
+            {
+                "created": {status.value: 0 for status in HouseStatus},
+                "updated": {status.value: 0 for status in HouseStatus},
+            },
+        )
+        status = HouseStatus(row.status).value
+        entry["created"][status] += row.created
+        entry["updated"][status] += row.updated
+    return [{"start": start, **counts} for start, counts in grouped.items()]
+
+
+def _tile_range(
+    south: float, west: float, north: float, east: float, level: int
+) -> Tuple[int, int, int, int]:
+    min_x, min_y = tile_for(north, west, level)
+    max_x, max_y = tile_for(south, east, level)
+    return min_x, min_y, max_x, max_y
+
+
+def heatmap_level(zoom: int, bbox: Optional[Tuple[float, float, float, float]] = None) -> int:
+    """Finest level allowed by ``zoom`` whose cells covering ``bbox`` stay within ``MAX_HEATMAP_CELLS``."""
+
+    candidates = [level for level in HEATMAP_LEVELS if level <= zoom + HEATMAP_LEVEL_OFFSET]
+    for level in reversed(candidates):
+        if bbox is None:
+            return level
+        min_x, min_y, max_x, max_y = _tile_range(*bbox, level)
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= MAX_HEATMAP_CELLS:
+            return level
+    return HEATMAP_LEVELS[0]
+
+
+def heatmap(
+    db: Session, south: float, west: float, north: float, east: float, zoom: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Return the cell level used and non-empty cells intersecting the bounding box."""
+
+    level = heatmap_level(zoom, (south, west, north, east))
+    min_x, min_y, max_x, max_y = _tile_range(south, west, north, east, level)
+    cell = models.HouseHeatmapCell
+    rows = (
+        db.query(cell.x, cell.y, cell.status, cell.count)
+        .filter(
+            cell.level == level,
+            cell.x.between(min_x, max_x),
+            cell.y.between(min_y, max_y),
+            cell.count > 0,
+        )
+        .order_by(cell.x, cell.y)
+    )
+
+    cells: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for x, y, status, count in rows:
+        entry = cells.get((x, y))
+        if entry is None:
+            cell_south, cell_west, cell_north, cell_east = tile_bounds(x, y, level)
+            entry = {
+                "x": x,
+                "y": y,
+                "south": cell_south,
+                "west": cell_west,
+                "north": cell_north,
+                "east": cell_east,
+                "count": 0,
+                "statuses": {status.value: 0 for status in HouseStatus},
+            }
+            cells[(x, y)] = entry
+        entry["count"] += count
+        entry["statuses"][HouseStatus(status).value] += count
+    return level, list(cells.values())
+
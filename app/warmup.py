@@ -0,0 +1,284 @@
+"""Houses cache warmup with optional on-disk snapshots.
+
+The warmup mode is selected with ``CACHE_WARMUP_MODE``:
+
+* ``blocking`` - warm the cache before the application starts accepting
+  traffic (the historical behaviour);
+* ``background`` - accept traffic immediately and warm the cache in a
+  worker thread;
+* ``lazy`` - skip warmup entirely, the first request fills the cache.
+
+When ``CACHE_SNAPSHOT_PATH`` is set, the serialized houses list is written to
+that file on shutdown and reused on the next start as long as the data
+revision stored alongside it still matches the database. The last list
+loaded (by warmup or a cache miss) is kept outside the TTL cache together
+with its revision, so shutdown only has to write it out.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import serialization
+from app.cache import houses_cache
+from app.database import SessionLocal
+from app.models import Comment, House
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MODES = {"blocking", "background", "lazy"}
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+def get_warmup_mode() -> str:
+    mode = os.getenv("CACHE_WARMUP_MODE", "blocking").strip().lower()
+    if mode not in WARMUP_MODES:
+        logger.warning("Unknown CACHE_WARMUP_MODE '%s', falling back to 'blocking'", mode)
+        return "blocking"
+    return mode
+
+
+def get_snapshot_path() -> Optional[Path]:
+    raw_path = os.getenv("CACHE_SNAPSHOT_PATH", "").strip()
+    return Path(raw_path) if raw_path else None
+
+
+class WarmupState:
+    """Thread-safe progress tracker exposed by the health endpoints."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.mode = "blocking"
+        self.status = "pending"
+        self.source: Optional[str] = None
+        self.total = 0
+        self.processed = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self, mode: str) -> None:
+        with self._lock:
+            self.mode = mode
+            self.status = "running"
+            self.source = None
+            self.total = 0
+            self.processed = 0
+            self.error = None
+            self.started_at = time.time()
+            self.finished_at = None
+
+    def progress(self, processed: int, total: Optional[int] = None) -> None:
+        with self._lock:
+            self.processed = processed
+            if total is not None:
+                self.total = total
+
+    def finish(self, status: str, source: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.source = source
+            self.error = error
+            self.finished_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            duration = None
+            if self.started_at is not None:
+                duration = (self.finished_at or time.time()) - self.started_at
+            return {
+                "mode": self.mode,
+                "status": self.status,
+                "source": self.source,
+                "total": self.total,
+                "processed": self.processed,
+                "error": self.error,
+                "duration_seconds": round(duration, 3) if duration is not None else None,
+            }
+
+
+warmup_state = WarmupState()
+# Set once ``on_startup`` has initialised the database and kicked off warmup.
+application_started = threading.Event()
+
+
+def compute_data_revision(db: Session) -> str:
+    """Return a cheap fingerprint of the houses and comments tables."""
+
+    house_count, house_max_id, house_max_updated = db.query(
+        func.count(House.id), func.max(House.id), func.max(House.updated_at)
+    ).one()
+    comment_count, comment_max_id = db.query(func.count(Comment.id), func.max(Comment.id)).one()
+    raw = "|".join(
+        str(part)
+        for part in (house_count, house_max_id, house_max_updated, comment_count, comment_max_id)
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def load_houses(db: Session, state: Optional[WarmupState] = None) -> List[Dict[str, Any]]:
+    if state is not None:
+        state.progress(0, db.query(func.count(House.id)).scalar() or 0)
+
+    houses = serialization.house_payloads(db, state.progress if state is not None else None)
+
+    if state is not None:
+        state.progress(len(houses), len(houses))
+    return houses
+
+
+def _load_snapshot(path: Path, revision: str) -> Optional[List[Dict[str, Any]]]:
+    if not path.is_file():
+        logger.debug("No cache snapshot found at %s", path)
+        return None
+
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        logger.warning("Failed to read cache snapshot at %s", path, exc_info=True)
+        return None
+
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_FORMAT_VERSION:
+        logger.info("Ignoring cache snapshot with unsupported format at %s", path)
+        return None
+    if payload.get("revision") != revision:
+        logger.info("Ignoring stale cache snapshot at %s", path)
+        return None
+
+    houses = payload.get("houses")
+    if not isinstance(houses, list) or not all(serialization.is_house_payload(item) for item in houses):
+        logger.warning("Cache snapshot at %s contains invalid houses", path)
+        return None
+    return houses
+
+
+_last_houses: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+_last_houses_lock = threading.Lock()
+
+
+def remember_houses(revision: str, houses: List[Dict[str, Any]]) -> None:
+    """Keep ``houses`` (loaded at ``revision``) for the shutdown snapshot."""
+
+    global _last_houses
+    with _last_houses_lock:
+        _last_houses = (revision, houses)
+
+
+def fetch_houses(db: Session) -> List[Dict[str, Any]]:
+    """Load the houses list for a cache miss and remember it for the snapshot."""
+
+    # Computed first: a write racing with the load makes the revision look
+    # older than the data, so the snapshot is discarded rather than trusted.
+    revision = compute_data_revision(db)
+    houses = load_houses(db)
+    remember_houses(revision, houses)
+    return houses
+
+
+def write_snapshot(path: Path) -> None:
+    """Write the last loaded houses list to ``path`` atomically.
+
+    Nothing is loaded here; the snapshot is skipped when no list was loaded
+    yet or the data has changed since.
+    """
+
+    with _last_houses_lock:
+        last_houses = _last_houses
+    if last_houses is None:
+        logger.info("No houses list loaded yet, skipping cache snapshot")
+        return
+    revision, houses = last_houses
+
+    db = SessionLocal()
+    try:
+        current_revision = compute_data_revision(db)
+    finally:
+        db.close()
+    if current_revision != revision:
+        logger.info("Houses changed since the last load, skipping cache snapshot")
+        return
+
+    payload = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "revision": revision,
+        "created_at": time.time(),
+        "houses": houses,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    logger.info("Wrote cache snapshot with %d houses to %s", len(houses), path)
+
+
+def warm_houses_cache(mode: str, snapshot_path: Optional[Path] = None) -> None:
+    warmup_state.start(mode)
+    db = SessionLocal()
+    try:
+        revision = compute_data_revision(db)
+        if snapshot_path is not None:
+            houses = _load_snapshot(snapshot_path, revision)
+            if houses is not None:
+                houses_cache.set("all", houses)
+                remember_houses(revision, houses)
+                warmup_state.progress(len(houses), len(houses))
+                warmup_state.finish("ready", source="snapshot")
+                logger.info("Loaded %d houses into cache from snapshot", len(houses))
+                return
+
+        logger.debug("Loading houses from the database to warm the cache")
+        houses = load_houses(db, warmup_state)
+        # Writes that land while a background warmup is running clear the cache;
+        # do not overwrite it with data that is already out of date.
+        db.rollback()
+        if compute_data_revision(db) != revision:
+            warmup_state.finish("ready", source="stale")
+            logger.info("Data changed during warmup, leaving cache to be filled lazily")
+            return
+        houses_cache.set("all", houses)
+        remember_houses(revision, houses)
+        warmup_state.finish("ready", source="database")
+        logger.info("Preloaded %d houses into cache", len(houses))
+    except Exception as exc:  # noqa: BLE001 - warmup must never crash the app
+        logger.exception("Cache warmup failed")
+        warmup_state.finish("failed", error=str(exc))
+        if mode == "blocking":
+            raise
+    finally:
+        db.close()
+        logger.debug("Database session closed after cache warmup")
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    mode = get_warmup_mode()
+    snapshot_path = get_snapshot_path()
+
+    if mode == "lazy":
+        warmup_state.start(mode)
+        warmup_state.finish("skipped")
+        logger.info("Cache warmup skipped (lazy mode)")
+        return None
+
+    if mode == "blocking":
+        warm_houses_cache(mode, snapshot_path)
+        return None
+
+    thread = threading.Thread(
+        target=warm_houses_cache,
+        args=(mode, snapshot_path),
+        name="houses-cache-warmup",
+        daemon=True,
+    )
+    thread.start()
+    logger.info("Cache warmup started in background")
+    return thread
@@ -0,0 +1,144 @@
+"""Local stand-ins for Overpass, Yandex Geocoder and Nominatim.
+
+The fake buildings live on a fixed global grid, so every query for the same
+area returns the same footprints and most points fall inside one of them.
+Latency and failure rates are configurable per run::
+
+    uvicorn benchmarks.fake_upstreams:app --port 9000
+"""
+
+import asyncio
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+
+CELL_LAT = 0.0003
+CELL_LON = 0.0005
+MAX_ELEMENTS = 2000
+
+AROUND_PATTERN = re.compile(r"around:(?P<radius>[\d.]+),(?P<lat>-?[\d.]+),(?P<lon>-?[\d.]+)")
+BBOX_PATTERN = re.compile(
+    r"\((?P<south>-?[\d.]+),(?P<west>-?[\d.]+),(?P<north>-?[\d.]+),(?P<east>-?[\d.]+)\)"
+)
+
+
+@dataclass
+class UpstreamBehaviour:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    failure_rate: float = 0.0
+    vertices: int = 4
+    seed: Optional[int] = None
+
+
+def _building_ring(cell_lat: int, cell_lon: int, vertices: int) -> List[Dict[str, float]]:
+    center_lat = (cell_lat + 0.5) * CELL_LAT
+    center_lon = (cell_lon + 0.5) * CELL_LON
+    radius_lat = CELL_LAT * 0.48
+    radius_lon = CELL_LON * 0.48
+    nodes = []
+    for step in range(vertices):
+        angle = 2 * math.pi * step / vertices + math.pi / vertices
+        nodes.append(
+            {
+                "lat": center_lat + radius_lat * math.sin(angle),
+                "lon": center_lon + radius_lon * math.cos(angle),
+            }
+        )
+    nodes.append(dict(nodes[0]))
+    return nodes
+
+
+def _elements_for_bbox(
+    south: float, west: float, north: float, east: float, vertices: int
+) -> List[Dict[str, Any]]:
+    elements: List[Dict[str, Any]] = []
+    for cell_lat in range(math.floor(south / CELL_LAT), math.floor(north / CELL_LAT) + 1):
+        for cell_lon in range(math.floor(west / CELL_LON), math.floor(east / CELL_LON) + 1):
+            if len(elements) >= MAX_ELEMENTS:
+                return elements
+            elements.append(
+                {
+                    "type": "way",
+                    "id": cell_lat * 10_000_000 + cell_lon,
+                    "tags": {"building": "yes"},
+                    "geometry": _building_ring(cell_lat, cell_lon, vertices),
+                }
+            )
+    return elements
+
+
+def _parse_query_bbox(query: str) -> Optional[Tuple[float, float, float, float]]:
+    around = AROUND_PATTERN.search(query)
+    if around:
+        radius = float(around["radius"])
+        lat, lon = float(around["lat"]), float(around["lon"])
+        delta_lat = radius / 111_320
+        delta_lon = radius / (111_320 * max(math.cos(math.radians(lat)), 0.01))
+        return lat - delta_lat, lon - delta_lon, lat + delta_lat, lon + delta_lon
+
+    bbox = BBOX_PATTERN.search(query)
+    if bbox:
+        return float(bbox["south"]), float(bbox["west"]), float(bbox["north"]), float(bbox["east"])
+    return None
+
+
+def create_app(behaviour: Optional[UpstreamBehaviour] = None) -> FastAPI:
+    behaviour = behaviour or UpstreamBehaviour()
+    rng = random.Random(behaviour.seed)
+    fake = FastAPI(title="FlatDrawer fake upstreams")
+    fake.state.behaviour = behaviour
+
+    async def simulate() -> Optional[JSONResponse]:
+        delay = behaviour.latency_ms + rng.uniform(-behaviour.jitter_ms, behaviour.jitter_ms)
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+        if rng.random() < behaviour.failure_rate:
+            return JSONResponse(status_code=503, content={"error": "simulated upstream failure"})
+        return None
+
+    @fake.post("/overpass")
+    async def overpass(request: Request) -> JSONResponse:
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        query = (await request.body()).decode("utf-8")
+        bbox = _parse_query_bbox(query)
+        elements = _elements_for_bbox(*bbox, behaviour.vertices) if bbox else []
+        return JSONResponse({"version": 0.6, "elements": elements})
+
+    @fake.get("/yandex")
+    async def yandex(geocode: str = Query(...)) -> JSONResponse:
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        lon, lat = (float(part) for part in geocode.split(","))
+        text = f"Россия, Москва, тестовая улица, {abs(int(lat * 10_000)) % 300 + 1}"
+        return JSONResponse(
+            {
+                "response": {
+                    "GeoObjectCollection": {
+                        "featureMember": [
+                            {"GeoObject": {"metaDataProperty": {"GeocoderMetaData": {"text": text}}}}
+                        ]
+                    }
+                }
+            }
+        )
+
+    @fake.get("/nominatim")
+    async def nominatim(lat: float = Query(...), lon: float = Query(...)) -> JSONResponse:
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        display_name = f"Тестовый дом {lat:.5f}, {lon:.5f}, Москва, Россия"
+        return JSONResponse({"display_name": display_name})
+
+    return fake
+
+
+app = create_app()
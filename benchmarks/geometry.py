@@ -0,0 +1,329 @@
+"""Micro-benchmarks for the geometry helpers in ``building_detector``.
+
+Each case runs over synthetic Overpass payloads (small houses, 1000-vertex
+industrial sites and multipolygon relations with a growing number of holes)
+and over the Overpass responses in ``benchmarks/fixtures``. The bundled
+``overpass_sample.json`` holds a house, an industrial site and a relation
+with 60 holes in the ``out geom`` format; ``--record`` captures real
+responses next to it so later runs repeat on the same data::
+
+    python -m benchmarks.geometry
+    python -m benchmarks.geometry --record 55.7558,37.6176 --record 55.7032,37.7208
+    python -m benchmarks.geometry --payload overpass_response.json --save-baseline
+    python -m benchmarks.geometry --filter relation --compare
+
+Relation assembly pairs every inner ring with every outer ring, so the
+``relation-*`` cases are sized to make quadratic regressions obvious.
+"""
+
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services import building_detector
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "geometry_baseline.json"
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+ORIGIN = (55.75, 37.62)
+TRACEBACK_DEPTH = 25
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], Any]
+
+
+def _ring_nodes(
+    center: Tuple[float, float], radius: float, vertices: int, rng: random.Random, noise: float = 0.0
+) -> List[Dict[str, float]]:
+    nodes = []
+    for step in range(vertices):
+        angle = 2 * math.pi * step / vertices
+        scale = radius * (1 + rng.uniform(-noise, noise))
+        nodes.append(
+            {"lat": center[0] + scale * math.sin(angle), "lon": center[1] + scale * math.cos(angle)}
+        )
+    nodes.append(dict(nodes[0]))
+    return nodes
+
+
+def small_house(rng: random.Random) -> Dict[str, Any]:
+    return {"type": "way", "id": 1, "geometry": _ring_nodes(ORIGIN, 0.0001, 6, rng)}
+
+
+def industrial_site(rng: random.Random, vertices: int = 1000) -> Dict[str, Any]:
+    return {"type": "way", "id": 2, "geometry": _ring_nodes(ORIGIN, 0.005, vertices, rng, noise=0.05)}
+
+
+def multipolygon_relation(rng: random.Random, outers: int, holes: int) -> Dict[str, Any]:
+    """Relation with ``outers`` square-ish outer rings and ``holes`` holes spread among them."""
+
+    members = []
+    side = math.ceil(math.sqrt(outers))
+    for index in range(outers):
+        center = (ORIGIN[0] + (index // side) * 0.01, ORIGIN[1] + (index % side) * 0.01)
+        members.append({"type": "way", "role": "outer", "geometry": _ring_nodes(center, 0.004, 32, rng)})
+    for index in range(holes):
+        outer_index = index % outers
+        center = (
+            ORIGIN[0] + (outer_index // side) * 0.01 + rng.uniform(-0.002, 0.002),
+            ORIGIN[1] + (outer_index % side) * 0.01 + rng.uniform(-0.002, 0.002),
+        )
+        members.append({"type": "way", "role": "inner", "geometry": _ring_nodes(center, 0.0001, 8, rng)})
+    return {"type": "relation", "id": 3, "members": members}
+
+
+def synthetic_payloads(seed: int) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    return {
+        "small-house": small_house(rng),
+        "industrial-1000": industrial_site(rng),
+        "relation-1x50": multipolygon_relation(rng, 1, 50),
+        "relation-4x200": multipolygon_relation(rng, 4, 200),
+        "relation-16x800": multipolygon_relation(rng, 16, 800),
+    }
+
+
+def recorded_payloads(path: Path) -> Dict[str, Dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    elements = data.get("elements", []) if isinstance(data, dict) else data
+    return {
+        f"{path.stem}-{element.get('type')}-{element.get('id', index)}": element
+        for index, element in enumerate(elements)
+        if element.get("type") in {"way", "relation"}
+    }
+
+
+def fixture_payloads(directory: Path = FIXTURES_DIR) -> Dict[str, Dict[str, Any]]:
+    payloads: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(directory.glob("*.json")):
+        payloads.update(recorded_payloads(path))
+    return payloads
+
+
+def record_payload(lat: float, lon: float, directory: Path = FIXTURES_DIR) -> Path:
+    """Save the raw Overpass response the single-point resolver would get for ``lat``/``lon``."""
+
+    import httpx
+
+    query = building_detector.OVERPASS_QUERY_TEMPLATE.format(lat=lat, lon=lon)
+    response = httpx.post(building_detector.OVERPASS_API_URL, content=query, timeout=60)
+    response.raise_for_status()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"overpass_{lat:.5f}_{lon:.5f}.json"
+    path.write_text(json.dumps(response.json(), ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def _parse_point(raw: str) -> Tuple[float, float]:
+    try:
+        lat, lon = (float(part) for part in raw.split(","))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("expected LAT,LON") from exc
+    return lat, lon
+
+
+def _first_ring(geometry: Dict[str, Any]) -> List[Tuple[float, float]]:
+    coordinates = geometry["coordinates"]
+    return coordinates[0] if geometry["type"] == "Polygon" else coordinates[0][0]
+
+
+def _hole_point(geometry: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    for polygon in reversed(polygons):
+        if len(polygon) > 1:
+            hole = polygon[-1]
+            return (
+                sum(lat for lat, _ in hole[:-1]) / (len(hole) - 1),
+                sum(lon for _, lon in hole[:-1]) / (len(hole) - 1),
+            )
+    return None
+
+
+def build_cases(payloads: Dict[str, Dict[str, Any]]) -> List[Case]:
+    detector = building_detector
+    cases: List[Case] = []
+    for label, element in payloads.items():
+        geometry = detector._convert_overpass_element(element)
+        if geometry is None:
+            continue
+
+        cases.append(Case(f"convert[{label}]", partial(detector._convert_overpass_element, element)))
+        if element.get("type") == "way":
+            nodes = element.get("geometry", [])
+            cases.append(Case(f"extract_ring[{label}]", partial(detector._extract_ring_from_geometry, nodes)))
+
+        ring = _first_ring(geometry)
+        inside = (
+            sum(lat for lat, _ in ring[:-1]) / (len(ring) - 1),
+            sum(lon for _, lon in ring[:-1]) / (len(ring) - 1),
+        )
+        outside = (inside[0] + 1.0, inside[1] + 1.0)
+        cases.append(Case(f"point_in_ring[{label}]", partial(detector._is_point_in_ring, ring, inside)))
+        cases.append(
+            Case(f"contains[{label}:outside]", partial(detector._geometry_contains_point, geometry, outside))
+        )
+        hole_point = _hole_point(geometry)
+        if hole_point is not None:
+            contains_hole = partial(detector._geometry_contains_point, geometry, hole_point)
+            cases.append(Case(f"contains[{label}:hole]", contains_hole))
+    return cases
+
+
+def measure_speed(func: Callable[[], Any], min_time: float, repeat: int) -> float:
+    """Return the best operations-per-second figure over ``repeat`` timed runs."""
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5:
+            break
+        loops *= 2
+
+    best = math.inf
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            best = min(best, (time.perf_counter() - started) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return 1 / best if best > 0 else math.inf
+
+
+def measure_allocations(func: Callable[[], Any]) -> Tuple[int, int]:
+    """Return ``(peak bytes, allocated blocks still referenced by the result)`` for one call."""
+
+    # tracemalloc's own snapshot bookkeeping and this module's frames would
+    # otherwise show up as blocks retained by the call.
+    ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+        tracemalloc.Filter(False, __file__),
+    )
+    tracemalloc.start(TRACEBACK_DEPTH)
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignored)
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignored)
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    return peak - baseline, blocks
+
+
+def run(cases: List[Case], min_time: float, repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case in cases:
+        ops = measure_speed(case.func, min_time, repeat)
+        peak_bytes, blocks = measure_allocations(case.func)
+        results[case.name] = {
+            "ops_per_sec": round(ops, 1),
+            "usec_per_op": round(1_000_000 / ops, 3),
+            "peak_kib": round(peak_bytes / 1024, 2),
+            "result_blocks": blocks,
+        }
+    return results
+
+
+def _print_results(
+    results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]
+) -> None:
+    width = max((len(name) for name in results), default=10) + 2
+    header = f"{'case':<{width}}{'ops/s':>14}{'us/op':>12}{'peak KiB':>11}{'blocks':>9}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        line = (
+            f"{name:<{width}}{row['ops_per_sec']:>14,.1f}{row['usec_per_op']:>12}"
+            f"{row['peak_kib']:>11}{row['result_blocks']:>9}"
+        )
+        if baseline is not None:
+            previous = baseline.get(name, {}).get("ops_per_sec")
+            line += f"{(row['ops_per_sec'] / previous - 1) * 100:>+9.1f}%" if previous else f"{'n/a':>10}"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark building_detector geometry helpers.")
+    parser.add_argument(
+        "--payload", type=Path, action="append", default=[], help="Recorded Overpass JSON response"
+    )
+    parser.add_argument("--no-synthetic", action="store_true", help="Only benchmark recorded payloads")
+    parser.add_argument("--no-fixtures", action="store_true", help=f"Skip the payloads in {FIXTURES_DIR}")
+    parser.add_argument(
+        "--record",
+        type=_parse_point,
+        action="append",
+        default=[],
+        metavar="LAT,LON",
+        help="Capture the Overpass response for a point into the fixtures directory and exit",
+    )
+    parser.add_argument("--filter", help="Only run cases whose name contains this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        for lat, lon in args.record:
+            print(f"Recorded {record_payload(lat, lon)}")
+        return
+
+    payloads: Dict[str, Dict[str, Any]] = {} if args.no_synthetic else synthetic_payloads(args.seed)
+    if not args.no_fixtures:
+        payloads.update(fixture_payloads())
+    for path in args.payload:
+        payloads.update(recorded_payloads(path))
+
+    cases = build_cases(payloads)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+    if not cases:
+        parser.error("No benchmark cases selected")
+
+    results = run(cases, args.min_time, args.repeat)
+
+    baseline = None
+    if args.compare and args.baseline.is_file():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        _print_results(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
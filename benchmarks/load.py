@@ -0,0 +1,326 @@
+"""HTTP load scenarios for FlatDrawer backed by local fake upstreams.
+
+By default the application and the fake Overpass/Yandex/Nominatim server are
+started in-process on free ports against a fresh SQLite database seeded with
+synthetic data::
+
+    python -m benchmarks.load --houses 5000 --comments 15000 --requests 500 --concurrency 20
+    python -m benchmarks.load --scenario list --scenario viewport --save-baseline
+    python -m benchmarks.load --compare
+
+``--base-url`` points the scenarios at an already running instance instead;
+seeding and upstream wiring are then up to the caller (see
+``benchmarks.seed`` and the ``*_URL`` environment variables of the services).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("list", "viewport", "create-burst", "resolve-burst")
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+VIEWPORT_SIZE = (0.01, 0.016)
+VIEWPORT_MAX_HOUSES = 25
+
+HouseRow = Tuple[int, float, float]
+Operation = Callable[[httpx.AsyncClient, random.Random], Awaitable[bool]]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    duration: float
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+        total = len(ordered) + self.errors
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "throughput_rps": round(total / self.duration, 2) if self.duration else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        }
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def run_scenario(
+    name: str,
+    operation: Operation,
+    client: httpx.AsyncClient,
+    total: int,
+    concurrency: int,
+    seed: int,
+) -> ScenarioResult:
+    result = ScenarioResult(name=name, duration=0.0)
+    remaining = iter(range(total))
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                ok = await operation(client, rng)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - started)
+            else:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def _random_point_near(rng: random.Random, houses: Sequence[HouseRow]) -> Tuple[float, float]:
+    _, lat, lon = rng.choice(houses)
+    return lat + rng.uniform(-0.002, 0.002), lon + rng.uniform(-0.002, 0.002)
+
+
+def build_operations(houses: Sequence[HouseRow]) -> Dict[str, Operation]:
+    async def list_houses(client: httpx.AsyncClient, rng: random.Random) -> bool:
+        response = await client.get("/api/houses/")
+        return response.status_code == 200
+
+    async def viewport(client: httpx.AsyncClient, rng: random.Random) -> bool:
+        # Mirrors the frontend at comment zoom: every visible marker loads its comments.
+        _, center_lat, center_lon = rng.choice(houses)
+        half_lat, half_lon = VIEWPORT_SIZE[0] / 2, VIEWPORT_SIZE[1] / 2
+        visible = [
+            house_id
+            for house_id, lat, lon in houses
+            if abs(lat - center_lat) <= half_lat and abs(lon - center_lon) <= half_lon
+        ][:VIEWPORT_MAX_HOUSES]
+        responses = await asyncio.gather(
+            *(client.get("/api/comments/", params={"house_id": house_id}) for house_id in visible)
+        )
+        return all(response.status_code == 200 for response in responses)
+
+    async def create_house(client: httpx.AsyncClient, rng: random.Random) -> bool:
+        lat, lon = _random_point_near(rng, houses)
+        payload = {"latitude": lat, "longitude": lon, "status": rng.choice(["red", "yellow", "green"])}
+        response = await client.post("/api/houses/", json=payload)
+        return response.status_code == 201
+
+    async def resolve_building(client: httpx.AsyncClient, rng: random.Random) -> bool:
+        lat, lon = _random_point_near(rng, houses)
+        response = await client.get("/api/buildings/resolve", params={"lat": lat, "lon": lon})
+        return response.status_code in {200, 404}
+
+    return {
+        "list": list_houses,
+        "viewport": viewport,
+        "create-burst": create_house,
+        "resolve-burst": resolve_building,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Run an ASGI application with uvicorn in a background thread."""
+
+    def __init__(self, asgi_app: Any, port: int) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        # Signal handlers can only be installed from the main thread.
+        self.server.install_signal_handlers = lambda: None
+        self.url = f"http://127.0.0.1:{port}"
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        deadline = time.time() + 30
+        while not self.server.started:
+            if time.time() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Server at {self.url} failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print("\nComparison with baseline (negative latency / positive throughput change is better):")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"  {name}: no baseline")
+            continue
+        deltas = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            before, after = previous.get(metric, 0.0), current[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            deltas.append(f"{metric} {before} -> {after} ({change:+.1f}%)")
+        print(f"  {name}: " + ", ".join(deltas))
+
+
+def _print_results(results: Dict[str, Dict[str, float]]) -> None:
+    header = (
+        f"{'scenario':<15}{'requests':>10}{'errors':>8}{'rps':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        print(
+            f"{name:<15}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+
+
+async def _run_all(
+    base_url: str, houses: Sequence[HouseRow], args: argparse.Namespace
+) -> Dict[str, Dict[str, float]]:
+    operations = build_operations(houses)
+    connections = args.concurrency * VIEWPORT_MAX_HOUSES
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    results: Dict[str, Dict[str, float]] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        for name in args.scenario or SCENARIOS:
+            total = args.requests if name in {"list", "viewport"} else args.burst
+            logger.info("Running scenario %s (%d operations, concurrency %d)", name, total, args.concurrency)
+            result = await run_scenario(name, operations[name], client, total, args.concurrency, args.seed)
+            results[name] = result.summary()
+    return results
+
+
+def _houses_from_api(base_url: str) -> List[HouseRow]:
+    response = httpx.get(f"{base_url}/api/houses/", timeout=60)
+    response.raise_for_status()
+    return [(item["id"], item["latitude"], item["longitude"]) for item in response.json()]
+
+
+def _run_in_process(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    workdir = Path(tempfile.mkdtemp(prefix="flatdrawer-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.setdefault("CACHE_WARMUP_MODE", "blocking")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from benchmarks.fake_upstreams import UpstreamBehaviour, create_app
+    from benchmarks.seed import seed_database
+
+    behaviour = UpstreamBehaviour(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        failure_rate=args.upstream_failure_rate,
+        vertices=args.vertices,
+        seed=args.seed,
+    )
+    with ServerThread(create_app(behaviour), _free_port()) as upstream:
+        from app.database import SessionLocal, init_db
+        from app.services import building_detector, yandex_maps
+
+        building_detector.OVERPASS_API_URL = f"{upstream.url}/overpass"
+        building_detector.NOMINATIM_URL = f"{upstream.url}/nominatim"
+        yandex_maps.YANDEX_GEOCODER_URL = f"{upstream.url}/yandex"
+
+        init_db()
+        db = SessionLocal()
+        try:
+            houses = seed_database(db, args.houses, args.comments, seed=args.seed)
+        finally:
+            db.close()
+
+        from app.main import app
+
+        with ServerThread(app, _free_port()) as server:
+            return asyncio.run(_run_all(server.url, houses, args))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run FlatDrawer HTTP load scenarios.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Repeat to select several")
+    parser.add_argument("--base-url", help="Target an already running instance")
+    parser.add_argument("--houses", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=6000)
+    parser.add_argument("--requests", type=int, default=200, help="Operations for read scenarios")
+    parser.add_argument("--burst", type=int, default=100, help="Operations for write/resolve bursts")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--upstream-failure-rate", type=float, default=0.0)
+    parser.add_argument("--vertices", type=int, default=4, help="Vertices per fake building footprint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        help="Log level for the harness and the in-process app",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    # httpx logs every request at INFO, both client -> app and app -> upstream.
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(max(logging.WARNING, logging.getLevelName(args.log_level)))
+
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+        houses = _houses_from_api(base_url)
+        if not houses:
+            parser.error("The target instance has no houses; seed it with benchmarks.seed first")
+        results = asyncio.run(_run_all(base_url, houses, args))
+    else:
+        results = _run_in_process(args)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        _print_results(results)
+
+    if args.compare:
+        if not args.baseline.is_file():
+            print(f"\nNo baseline found at {args.baseline}")
+        else:
+            _compare(results, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
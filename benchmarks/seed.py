@@ -0,0 +1,127 @@
+"""Seed a FlatDrawer database with synthetic houses and comments.
+
+Usage::
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --houses 20000 --comments 60000
+"""
+
+import argparse
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Rough bounding box around Moscow; keeps generated points on land and dense
+# enough for viewport scenarios to return several houses at once.
+DEFAULT_BBOX: Tuple[float, float, float, float] = (55.55, 37.35, 55.95, 37.85)
+
+STREETS = (
+    "Тверская улица",
+    "Ленинский проспект",
+    "улица Арбат",
+    "Профсоюзная улица",
+    "Кутузовский проспект",
+    "улица Покровка",
+    "Садовая-Кудринская улица",
+    "Варшавское шоссе",
+)
+COMMENT_TEXTS = (
+    "Хороший подъезд, требуется ремонт кровли",
+    "Собственник готов к торгу",
+    "Рядом строится метро",
+    "Плохое состояние фасада",
+    "Стоит посмотреть ещё раз",
+)
+
+
+def random_point(
+    rng: random.Random, bbox: Tuple[float, float, float, float] = DEFAULT_BBOX
+) -> Tuple[float, float]:
+    south, west, north, east = bbox
+    return rng.uniform(south, north), rng.uniform(west, east)
+
+
+def seed_database(
+    db: Session,
+    houses: int,
+    comments: int,
+    seed: int = 42,
+    bbox: Tuple[float, float, float, float] = DEFAULT_BBOX,
+    batch_size: int = 1000,
+) -> List[Tuple[int, float, float]]:
+    """Insert ``houses`` houses and ``comments`` comments and return ``(id, lat, lon)`` rows."""
+
+    from app import search, stats
+    from app.models import Comment, House, HouseStatus
+
+    rng = random.Random(seed)
+    statuses = list(HouseStatus)
+    now = datetime.utcnow()
+    created: List[Tuple[int, float, float]] = []
+
+    for offset in range(0, houses, batch_size):
+        batch = []
+        for index in range(offset, min(offset + batch_size, houses)):
+            lat, lon = random_point(rng, bbox)
+            created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            batch.append(
+                House(
+                    address=f"Москва, {rng.choice(STREETS)}, {index % 250 + 1}",
+                    latitude=lat,
+                    longitude=lon,
+                    status=rng.choice(statuses),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+        db.add_all(batch)
+        db.flush()
+        created.extend((house.id, house.latitude, house.longitude) for house in batch)
+        db.commit()
+
+    house_ids = [row[0] for row in created]
+    for offset in range(0, comments if house_ids else 0, batch_size):
+        db.add_all(
+            [
+                Comment(
+                    house_id=rng.choice(house_ids),
+                    text=rng.choice(COMMENT_TEXTS),
+                    author=f"bench-{rng.randint(1, 50)}",
+                )
+                for _ in range(offset, min(offset + batch_size, comments))
+            ]
+        )
+        db.commit()
+
+    search.rebuild_index(db)
+    stats.rebuild(db)
+    db.commit()
+    logger.info("Seeded %d houses and %d comments", len(created), comments if house_ids else 0)
+    return created
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--houses", type=int, default=1000)
+    parser.add_argument("--comments", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    from app.database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        seed_database(db, args.houses, args.comments, seed=args.seed)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()